@@ -1,12 +1,14 @@
 import json
 import os
-import duckdb
-import requests
-from langchain_groq import ChatGroq
-from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
-from langgraph.errors import GraphRecursionError
-from ddgs import DDGS
+from functools import lru_cache
+from duckdb_pool import get_pool
+from result_cache import ResultCache
+from sql_fetch import FetchBudget, count_sql
+from query_guard import QueryGuard, QueryRejected
+
+# langchain_groq, langgraph, langchain_core and ddgs are imported where they're
+# used, and the key, prompt and agent are built on the first question, so
+# importing this module stays fast and works without secrets.txt.
 
 # --------------------------------------------------
 # 1. Load API Key
@@ -27,23 +29,22 @@ def load_groq_api_key():
         pass
     return None
 
-groq_api_key = load_groq_api_key()
-if not groq_api_key:
-    raise ValueError("GROQ_API_KEY not found in secrets.txt")
-
 # --------------------------------------------------
 # 2. Load schema and domain rules
 # --------------------------------------------------
 script_dir = os.path.dirname(os.path.abspath(__file__))
 context_file = os.path.join(script_dir, "prompt-context.json")
 
-try:
-    with open(context_file, "r") as f:
-        context_data = json.load(f)
-except FileNotFoundError:
-    raise FileNotFoundError(f"Could not find {context_file}")
 
-schema_context = f"""
+@lru_cache(maxsize=None)
+def get_schema_context():
+    try:
+        with open(context_file, "r") as f:
+            context_data = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Could not find {context_file}")
+
+    return f"""
 You are a cricket data analysis assistant.
 You have access to a DuckDB cricket database.
 
@@ -67,11 +68,18 @@ Always:
 # --------------------------------------------------
 # 3. LLM Setup
 # --------------------------------------------------
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    max_tokens=4096
-)
+@lru_cache(maxsize=None)
+def get_llm():
+    groq_api_key = load_groq_api_key()
+    if not groq_api_key:
+        raise ValueError("GROQ_API_KEY not found in secrets.txt")
+
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model="llama-3.3-70b-versatile",
+        temperature=0,
+        max_tokens=4096
+    )
 
 # --------------------------------------------------
 # 4. Database Path
@@ -80,39 +88,76 @@ db_path = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
     "cricket.duckdb"
 )
+# One warm read-only connection for the whole process; each call gets a cursor
+db_pool = get_pool(db_path)
+# Tool results by normalized SQL, dropped whenever setup_duckdb loads new data.
+# Set CRICKET_SQL_CACHE_DIR to keep them on disk across runs as well.
+sql_cache = ResultCache(disk_dir=os.environ.get("CRICKET_SQL_CACHE_DIR"))
+# Rows and bytes one tool call may return; the query itself is capped with a LIMIT
+fetch_budget = FetchBudget(
+    max_rows=int(os.environ.get("CRICKET_SQL_MAX_ROWS", 10)),
+    max_bytes=int(os.environ.get("CRICKET_SQL_MAX_BYTES", 16 << 10)),
+)
+# Queries whose plan estimates more rows than this are rejected unrun (usually
+# a missing join condition); anything still running after the timeout is interrupted
+query_guard = QueryGuard(
+    max_estimated_rows=int(os.environ.get("CRICKET_SQL_MAX_ESTIMATED_ROWS", 10**9)),
+    timeout=float(os.environ.get("CRICKET_SQL_TIMEOUT", 30)),
+)
 
 # --------------------------------------------------
 # 5. Tools
 # --------------------------------------------------
+# Plain functions here; get_agent() wraps them as langchain tools
 
-@tool
-def cricket_sql_tool(query: str) -> str:
+def cricket_sql_tool(query: str, count_rows: bool = False) -> str:
     """
     Query the DuckDB cricket database and return results.
+    Only the first rows are returned; set count_rows to also get the total number of matching rows.
+    Send one statement per call. Several statements, queries estimated to be too expensive (e.g. joins
+    without a join condition) or running too long come back as "SQL Rejected" with a hint; rewrite them
+    and try again.
     """
     try:
-        conn = duckdb.connect(db_path)
-        result = conn.execute(query).fetchall()
-        columns = [desc[0] for desc in conn.description]
-        conn.close()
+        version = db_pool.load_version()
+        answer = sql_cache.get(query, version)
+        if answer is None:
+            with db_pool.cursor() as conn, query_guard.guarded(conn, query):
+                result, columns, truncated = fetch_budget.fetch(conn, query)
 
-        if not result:
-            return "No results found in database."
+            if not result and not truncated:
+                answer = "No results found in database."
+            elif len(result) == 1 and len(result[0]) == 1 and not truncated:
+                answer = str(result[0][0])
+            elif not result:
+                answer = (f"First row exceeds the {fetch_budget.max_bytes}-byte result budget; "
+                          "select fewer or narrower columns.")
+            else:
+                formatted_result = [dict(zip(columns, row)) for row in result]
+                answer = json.dumps(formatted_result, indent=2, default=str)
+                if truncated:
+                    answer += f"\n(first {len(result)} rows shown; more rows matched)"
+            sql_cache.put(query, version, answer)
 
-        if len(result) == 1 and len(result[0]) == 1:
-            return str(result[0][0])
-
-        formatted_result = [
-            dict(zip(columns, row))
-            for row in result[:10]  # limit to 10
-        ]
-        return json.dumps(formatted_result, indent=2, default=str)
+        if not count_rows:
+            return answer
+        # Cached under the count query itself, so it never mixes with the rows above
+        counting = count_sql(query)
+        total = sql_cache.get(counting, version) if counting else None
+        if total is None:
+            with db_pool.cursor() as conn, query_guard.guarded(conn, query):
+                total = str(fetch_budget.count(conn, query))
+            if counting:
+                sql_cache.put(counting, version, total)
+        return f"{answer}\nTotal rows: {total}"
 
+    except QueryRejected as e:
+        # Structured, so the agent can retry with a cheaper query
+        return f"SQL Rejected: {e.to_json()}"
     except Exception as e:
         return f"SQL Error: {str(e)}"
 
 
-@tool
 def normalize_cricket_terms_tool(text: str) -> str:
     """
     Normalize cricket terms and abbreviations into official names.
@@ -136,13 +181,13 @@ def normalize_cricket_terms_tool(text: str) -> str:
     return text
 
 
-@tool
 def duckduckgo_search_tool(query: str) -> str:
     """
     Search DuckDuckGo for cricket-related information as a fallback.
     Use this when the database query fails or returns no results.
     """
     try:
+        from ddgs import DDGS
         # # DuckDuckGo Instant Answer API
         # url = "https://api.duckduckgo.com/"
         # params = {
@@ -194,10 +239,13 @@ def duckduckgo_search_tool(query: str) -> str:
 # --------------------------------------------------
 tools = [normalize_cricket_terms_tool, cricket_sql_tool, duckduckgo_search_tool]
 
-system_message = f"""
+
+@lru_cache(maxsize=None)
+def get_system_message():
+    return f"""
 You are a cricket data analysis assistant with access to a DuckDB cricket database.
 
-{schema_context}
+{get_schema_context()}
 
 When answering questions:
 1. Normalize terms using normalize_cricket_terms_tool before querying.
@@ -207,13 +255,23 @@ When answering questions:
 5. Provide the final concise answer in plain text.
 """
 
-agent_executor = create_react_agent(llm, tools)
+
+@lru_cache(maxsize=None)
+def get_agent():
+    """The compiled ReAct agent, built on first use and reused after."""
+    from langchain_core.tools import tool
+    from langgraph.prebuilt import create_react_agent
+    return create_react_agent(get_llm(), [tool(f) for f in tools])
 
 # --------------------------------------------------
 # 7. Agent Query Function
 # --------------------------------------------------
 def ask_cricket_agent(question: str):
     print(f"\n[User Question] {question}")
+    # A missing key or prompt file is a setup error, not something to search the web for
+    agent_executor = get_agent()
+    system_message = get_system_message()
+    from langgraph.errors import GraphRecursionError
     
     try:
         result = agent_executor.invoke({
@@ -229,14 +287,14 @@ def ask_cricket_agent(question: str):
     except GraphRecursionError:
         print("[Warning] Graph recursion limit reached. Falling back to DuckDuckGo search...")
         # Use DuckDuckGo search as fallback
-        search_result = duckduckgo_search_tool.invoke({"query": question})
+        search_result = duckduckgo_search_tool(question)
         return f"🌐 [WEB SEARCH] Database query exceeded recursion limit. Here's what I found from web search:\n\n{search_result}"
     
     except Exception as e:
         print(f"[Error] Unexpected error: {str(e)}")
         # Also try DuckDuckGo search for other errors
         try:
-            search_result = duckduckgo_search_tool.invoke({"query": question})
+            search_result = duckduckgo_search_tool(question)
             return f"🌐 [WEB SEARCH] Database query failed ({str(e)}). Here's what I found from web search:\n\n{search_result}"
         except:
             return f"❌ [ERROR] Both database and web search failed. Error: {str(e)}"
@@ -256,6 +314,8 @@ if __name__ == "__main__":
 
     print("\n--- Q1 ---")
     print(ask_cricket_agent(q1))
+    print(f"[SQL cache] {sql_cache.stats()}")
+    print(f"[SQL guard] {query_guard.counters}")
 
     # print("\n--- Q2 ---")
     # print(ask_cricket_agent(q2))
@@ -0,0 +1,117 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import duckdb
+
+
+class DuckDBPool:
+    """Process-wide read-only connection to cricket.duckdb, shared by every tool call.
+
+    Opening the database file and reading its catalog happens once instead of
+    on every cricket_sql_tool call. Each call gets its own cursor (a separate
+    connection to the same database instance), so concurrent calls from
+    different threads never share query state.
+
+    When the file is replaced or rewritten (a new inode, size or mtime), the
+    next call waits for in-flight cursors to finish and reopens it. Waiting is
+    needed because closing the old connection would break those cursors, and
+    DuckDB keeps serving the old database to new connections while any of
+    them is still open.
+
+    load_version() is the load_id of the latest load in setup_duckdb's
+    load_history, read once per (re)connect. It is unique per load, even
+    across databases rebuilt from scratch (where load_history's version
+    restarts at 1), and every load replaces the file, so it is never stale.
+
+    A read-only connection holds a shared lock on the file for as long as
+    the pool is open. setup_duckdb never writes to cricket.duckdb in place:
+    it builds each load in a separate file and os.replace()s it over this
+    one, which the next call here picks up as a new inode. Anything else
+    that writes the database must do the same while the agent is running.
+
+        pool = DuckDBPool(db_path)
+        with pool.cursor() as cur:
+            rows = cur.execute(sql).fetchall()
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._con = None
+        self._signature = None
+        self._load_version = None
+        self._active = 0
+        self._cond = threading.Condition()
+        self.reconnects = 0
+
+    def _file_signature(self):
+        st = os.stat(self.path)
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _connect(self, signature):
+        while self._active:
+            self._cond.wait()
+        if signature == self._signature:
+            return  # another call reconnected while this one waited
+        if self._con is not None:
+            self._con.close()
+            self.reconnects += 1
+        self._con = duckdb.connect(self.path, read_only=True)
+        self._signature = signature
+        try:
+            latest = self._con.execute("SELECT load_id FROM load_history ORDER BY version DESC LIMIT 1").fetchone()
+        except (duckdb.CatalogException, duckdb.BinderException):
+            latest = None  # loaded before load_history, or before it had load_id
+        if latest and latest[0] is not None:
+            self._load_version = str(latest[0])
+        else:
+            # The file itself is the version
+            self._load_version = "file:%d:%d:%d" % signature
+
+    @contextmanager
+    def cursor(self):
+        signature = self._file_signature()
+        with self._cond:
+            if signature != self._signature:
+                self._connect(signature)
+            cur = self._con.cursor()
+            self._active += 1
+        try:
+            yield cur
+        finally:
+            cur.close()
+            with self._cond:
+                self._active -= 1
+                if not self._active:
+                    self._cond.notify_all()
+
+    def load_version(self):
+        """Version of the data currently served, reconnecting first if the file changed."""
+        signature = self._file_signature()
+        with self._cond:
+            if signature != self._signature:
+                self._connect(signature)
+            return self._load_version
+
+    def close(self):
+        with self._cond:
+            while self._active:
+                self._cond.wait()
+            if self._con is not None:
+                self._con.close()
+            self._con = None
+            self._signature = None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path):
+    """The process-wide pool for path, created on first use."""
+    path = os.path.abspath(path)
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = DuckDBPool(path)
+        return pool
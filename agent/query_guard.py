@@ -0,0 +1,157 @@
+import json
+import threading
+from contextlib import contextmanager
+
+import duckdb
+
+from sql_fetch import query_statement, single_statement
+
+
+class QueryRejected(Exception):
+    """A query the guard refused to run or stopped; details is the structured error for the agent."""
+
+    def __init__(self, details):
+        super().__init__(details["error"])
+        self.details = details
+
+    def to_json(self):
+        return json.dumps(self.details, indent=2)
+
+
+# Joins DuckDB may plan without an estimate of their own; their output can
+# be as large as the product of their inputs
+_PRODUCT_JOINS = {"CROSS_PRODUCT", "NESTED_LOOP_JOIN", "BLOCKWISE_NL_JOIN", "PIECEWISE_MERGE_JOIN"}
+
+
+def _plan_estimate(node):
+    """(estimated rows out of node, largest estimate anywhere in its subtree).
+
+    Nodes without an "Estimated Cardinality" get one from their children: a
+    join the product of its inputs, an ungrouped aggregate a single row, and
+    anything else (limits, ...) the largest input as an upper bound.
+    """
+    children = [_plan_estimate(child) for child in node.get("children", [])]
+    estimate = node.get("extra_info", {}).get("Estimated Cardinality")
+    if estimate is not None:
+        rows = int(estimate)
+    elif node["name"] in _PRODUCT_JOINS:
+        rows = 1
+        for child_rows, _ in children:
+            rows *= child_rows
+    elif node["name"] == "UNGROUPED_AGGREGATE":
+        rows = 1
+    else:
+        rows = max((child_rows for child_rows, _ in children), default=0)
+    return rows, max([rows] + [largest for _, largest in children])
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("children", []):
+        yield from _plan_nodes(child)
+
+
+class QueryGuard:
+    """Cost check and wall-clock deadline for agent-written SQL.
+
+    Before a query runs, its plan is read with EXPLAIN (FORMAT json). If any
+    operator's estimated cardinality is above max_estimated_rows (typically a
+    CROSS_PRODUCT from a forgotten join condition between ball_by_ball,
+    players and matches) the query is rejected without executing. DuckDB
+    gives cross products and nested-loop joins no estimate of their own, so
+    theirs is the product of their inputs' estimates. Statements that can't
+    be explained as a query (PRAGMA, DESCRIBE, ...) skip the check; text
+    holding more than one statement is rejected, since none of it could be
+    checked or row-limited.
+
+    Whatever runs is interrupted once it passes timeout seconds.
+
+    Both raise QueryRejected, whose details say what went wrong and how to
+    retry, so the agent can rewrite the query instead of waiting on it.
+
+        guard = QueryGuard(max_estimated_rows=10**9, timeout=30)
+        with pool.cursor() as cur, guard.guarded(cur, sql):
+            rows = cur.execute(sql).fetchall()
+    """
+
+    def __init__(self, max_estimated_rows=10**9, timeout=30.0):
+        self.max_estimated_rows = max_estimated_rows
+        self.timeout = timeout
+        self.counters = {"rejected": 0, "timed_out": 0}
+        self._lock = threading.Lock()
+
+    def estimate(self, cur, sql):
+        """(largest estimated cardinality, number of cross products) in sql's plan, or None if it has none."""
+        statement = query_statement(sql)
+        if statement is None:
+            return None
+        rows = cur.execute(f"EXPLAIN (FORMAT json) {statement}").fetchall()
+        largest = 0
+        cross_products = 0
+        for _, plan in rows:
+            for root in json.loads(plan):
+                largest = max(largest, _plan_estimate(root)[1])
+                cross_products += sum(node["name"] == "CROSS_PRODUCT" for node in _plan_nodes(root))
+        return largest, cross_products
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def check(self, cur, sql):
+        """Raise QueryRejected if sql holds several statements or its plan is estimated above max_estimated_rows."""
+        if single_statement(sql) is None:
+            self._count("rejected")
+            raise QueryRejected({
+                "error": "multiple_statements",
+                "hint": "Send exactly one SQL statement per call; run each statement as its own cricket_sql_tool call.",
+            })
+        estimate = self.estimate(cur, sql)
+        if estimate is None or estimate[0] <= self.max_estimated_rows:
+            return
+        largest, cross_products = estimate
+        self._count("rejected")
+        hint = "Narrow the query with filters or pre-aggregate before joining."
+        if cross_products:
+            hint = ("The plan has a cross product: every table in FROM needs a join condition "
+                    "(e.g. ball_by_ball.striker_id = players.player_id, ball_by_ball.match_id = matches.match_id).")
+        raise QueryRejected({
+            "error": "query_too_expensive",
+            "estimated_rows": largest,
+            "max_estimated_rows": self.max_estimated_rows,
+            "cross_products": cross_products,
+            "hint": hint,
+        })
+
+    @contextmanager
+    def deadline(self, cur):
+        """Interrupt whatever cur is running once timeout seconds have passed."""
+        fired = threading.Event()
+
+        def interrupt():
+            fired.set()
+            cur.interrupt()
+
+        timer = threading.Timer(self.timeout, interrupt)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        except duckdb.InterruptException:
+            if not fired.is_set():
+                raise
+            self._count("timed_out")
+            raise QueryRejected({
+                "error": "query_timeout",
+                "timeout_seconds": self.timeout,
+                "hint": "The query ran too long. Add filters, aggregate earlier, or query a smaller table.",
+            }) from None
+        finally:
+            timer.cancel()
+
+    @contextmanager
+    def guarded(self, cur, sql):
+        """Check sql's plan, then run the block under the deadline."""
+        with self.deadline(cur):
+            self.check(cur, sql)
+            yield
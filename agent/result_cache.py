@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# SQL tokens, so normalization never touches the inside of a literal or a
+# quoted identifier: 'Lord''s' and "over" stay exactly as written
+_TOKENS = re.compile(r"""
+      (?P<string>'(?:[^']|'')*')
+    | (?P<ident>"(?:[^"]|"")*")
+    | (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<word>\w+)
+    | (?P<space>\s+)
+    | (?P<other>.)
+""", re.S | re.X)
+
+# Functions whose result changes between runs of the same query
+_VOLATILE = re.compile(r"\b(random|setseed|uuid|gen_random_uuid|now|today|current_date|current_time|"
+                       r"current_timestamp|get_current_time|get_current_timestamp)\b")
+
+
+def _number(text):
+    """Canonical spelling of a numeric literal that keeps its type: 007 -> 7, 1.50 stays 1.50."""
+    if text.isdigit():
+        return str(int(text))
+    return text.lower()
+
+
+def normalize_sql(sql):
+    """Cache key for sql: the same query however it is spaced, cased or commented.
+
+    Keywords and unquoted identifiers are lowercased (DuckDB treats them
+    case-insensitively), whitespace collapses, comments and trailing
+    semicolons go, and integer literals lose leading zeros. String literals
+    and quoted identifiers are kept verbatim, since 'Test' and 'test' are
+    different queries.
+    """
+    out = []
+    for match in _TOKENS.finditer(sql):
+        kind, text = match.lastgroup, match.group()
+        if kind in ("space", "comment"):
+            continue
+        if kind == "word":
+            text = text.lower()
+        elif kind == "number":
+            text = _number(text)
+        # A space only where two words, numbers or literals would otherwise merge
+        if out and kind != "other" and out[-1][0] != "other":
+            out.append(("space", " "))
+        out.append((kind, text))
+    while out and out[-1][1] == ";":
+        out.pop()
+    return "".join(text for _, text in out)
+
+
+class ResultCache:
+    """LRU cache of cricket_sql_tool results, keyed by normalized SQL.
+
+    Entries belong to one database load version: the first lookup with a new
+    version empties the cache, so an answer never outlives the data it came
+    from. The memory tier is bounded by entry count and by bytes; with
+    disk_dir set, entries are also written there as JSON files (bounded by
+    max_disk_entries) and survive restarts, still tied to their version.
+
+    stats() returns the hit/miss counters.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=16 << 20, disk_dir=None, max_disk_entries=4096):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._version is not None:
+                self.counters["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_disk(self, key, version):
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        if entry.get("version") != version:
+            os.remove(path)  # from an older load, never valid again
+            return None
+        os.utime(path)  # mtime is the disk tier's LRU clock
+        return entry["value"]
+
+    def _write_disk(self, key, version, value):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "key": key, "value": value}, f)
+        os.replace(tmp_path, path)
+        files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith(".json")]
+        if len(files) > self.max_disk_entries:
+            files.sort(key=lambda p: os.stat(p).st_mtime_ns)
+            for old in files[:len(files) - self.max_disk_entries]:
+                os.remove(old)
+
+    def _store(self, key, value):
+        size = len(key.encode("utf-8")) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.counters["evictions"] += 1
+
+    def get(self, sql, version):
+        """The cached result of sql at this load version, or None."""
+        key = normalize_sql(sql)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[0]
+            if self.disk_dir:
+                value = self._read_disk(key, version)
+                if value is not None:
+                    self._store(key, value)
+                    self.counters["disk_hits"] += 1
+                    return value
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, sql, version, value):
+        key = normalize_sql(sql)
+        if _VOLATILE.search(key):
+            return
+        with self._lock:
+            if version != self._version:
+                return  # computed against a load that has since been replaced
+            self._store(key, value)
+            if self.disk_dir:
+                self._write_disk(key, version, value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hit_rate = (self.counters["hits"] + self.counters["disk_hits"]) / lookups if lookups else 0.0
+            return {**self.counters, "entries": len(self._entries), "bytes": self._bytes,
+                    "hit_rate": round(hit_rate, 3)}
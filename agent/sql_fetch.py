@@ -0,0 +1,105 @@
+import json
+
+from result_cache import _TOKENS
+
+# Statements that can be wrapped as a subquery: SELECT, WITH ... SELECT,
+# DuckDB's FROM-first form, VALUES, TABLE and parenthesised queries
+_QUERY_STARTS = {"select", "with", "from", "values", "table", "("}
+
+
+def single_statement(sql):
+    """sql without trailing semicolons and comments, or None if it holds more than one statement."""
+    tokens = [(m.lastgroup, m.group()) for m in _TOKENS.finditer(sql)]
+    end = len(tokens)
+    while end and (tokens[end - 1][0] in ("space", "comment") or tokens[end - 1][1] == ";"):
+        end -= 1
+    if any(text == ";" for kind, text in tokens[:end] if kind == "other"):
+        return None
+    return "".join(text for _, text in tokens[:end])
+
+
+def _first_word(sql):
+    for match in _TOKENS.finditer(sql):
+        if match.lastgroup not in ("space", "comment"):
+            return match.group().lower()
+    return None
+
+
+def query_statement(sql):
+    """sql as one wrappable query without trailing semicolons and comments, or None.
+
+    Only single SELECT, WITH, FROM-first, VALUES and TABLE statements can go
+    inside a subquery; PRAGMA, DESCRIBE, SHOW and multi-statement text can't.
+    """
+    statement = single_statement(sql)
+    if statement is None or _first_word(statement) not in _QUERY_STARTS:
+        return None
+    return statement
+
+
+def limit_sql(sql, limit):
+    """sql capped at limit rows inside DuckDB, or None if it can't be wrapped.
+
+    DuckDB materializes a whole result on execute() whenever the plan has an
+    ORDER BY, aggregate or join, so fetchmany() after it saves nothing; a
+    LIMIT on the outside becomes a Top-N or stops the scan early. The newline
+    before the closing parenthesis keeps a trailing -- comment from eating it.
+    """
+    statement = query_statement(sql)
+    if statement is None:
+        return None
+    return f"SELECT * FROM (\n{statement}\n) LIMIT {int(limit)}"
+
+
+def count_sql(sql):
+    """SQL for the number of rows sql returns, or None if it can't be wrapped."""
+    statement = query_statement(sql)
+    if statement is None:
+        return None
+    return f"SELECT count(*) FROM (\n{statement}\n)"
+
+
+class FetchBudget:
+    """Per-call cap on the rows and bytes cricket_sql_tool hands back to the agent.
+
+    At most max_rows + 1 rows are produced (the extra one only tells whether
+    the result was cut), and rows stop being added once their JSON would go
+    past max_bytes.
+
+        budget = FetchBudget(max_rows=10, max_bytes=16384)
+        rows, columns, truncated = budget.fetch(cur, sql)
+    """
+
+    def __init__(self, max_rows=10, max_bytes=16 << 10):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+
+    def fetch(self, cur, sql):
+        """(rows, column names, truncated) for sql, producing no more rows than the budget needs."""
+        limited = limit_sql(sql, self.max_rows + 1)
+        cur.execute(limited or sql)
+        columns = [desc[0] for desc in cur.description] if cur.description else []
+        # Without the wrapper fetchmany still streams pipelined plans (plain scans and filters)
+        rows = cur.fetchmany(self.max_rows + 1)
+        truncated = len(rows) > self.max_rows
+        rows = rows[:self.max_rows]
+
+        size = 2  # the enclosing []
+        for i, row in enumerate(rows):
+            size += len(json.dumps(dict(zip(columns, row)), indent=2, default=str)) + 2
+            if size > self.max_bytes:
+                return rows[:i], columns, True
+        return rows, columns, truncated
+
+    def count(self, cur, sql):
+        """Number of rows sql returns, counted inside DuckDB where the query can be wrapped."""
+        counting = count_sql(sql)
+        if counting is not None:
+            return cur.execute(counting).fetchone()[0]
+        cur.execute(sql)
+        total = 0
+        while True:
+            batch = cur.fetchmany(2048)
+            if not batch:
+                return total
+            total += len(batch)
@@ -0,0 +1,187 @@
+# Precomputed aggregate tables for cricket.duckdb, built by setup_duckdb.py
+# from the ball table so they always agree with it. The agent's usual
+# questions (averages, hundreds, sixes, bowling figures by format, year,
+# opponent or venue) become small lookups instead of a GROUP BY over every
+# delivery.
+#
+# Each function returns the SELECT for one table. The per-innings tables can
+# be restricted to some matches and the career tables to some players, so an
+# incremental load only recomputes what new matches touch.
+
+# Dismissals credited to the bowler; everything else (run out, retired,
+# obstructing the field...) still counts against the batter
+BOWLER_WICKETS = "('bowled', 'caught', 'caught and bowled', 'lbw', 'stumped', 'hit wicket')"
+NOT_OUT_KINDS = "('retired hurt', 'retired not out')"
+
+# extra_type holds comma-joined extras such as 'noballs,legbyes'
+WIDE = "coalesce(contains(CAST(extra_type AS VARCHAR), 'wides'), false)"
+NO_BALL = "coalesce(contains(CAST(extra_type AS VARCHAR), 'noballs'), false)"
+
+# The team in the field in an innings: whichever of the match's two teams isn't batting
+FIELDING_TEAM = """CASE i.batting_team_id
+            WHEN m.home_team_id THEN m.away_team_id
+            WHEN m.away_team_id THEN m.home_team_id
+        END"""
+
+INNINGS_ORDER = "match_type, date_start, match_id, innings, player_id"
+CAREER_ORDER = "player_id, match_type, year, opponent_team_id, venue"
+
+
+def _match_filter(matches):
+    return f"WHERE match_id IN ({matches})" if matches else ""
+
+
+def batting_innings(balls, matches=None):
+    """One row per batter per innings, including batters dismissed without facing a ball."""
+    return f"""
+        WITH balls AS (
+            SELECT * FROM {balls} {_match_filter(matches)}
+        ),
+        faced AS (
+            SELECT match_id, innings, striker_id AS player_id,
+                   SUM(runs_batsman) AS runs,
+                   COUNT(*) FILTER (WHERE NOT {WIDE}) AS balls,
+                   SUM(four) AS fours,
+                   SUM(six) AS sixes
+            FROM balls
+            GROUP BY ALL
+        ),
+        dismissals AS (
+            -- dismissed_player is a name: match it to whichever batter was at the crease
+            SELECT b.match_id, b.innings,
+                   CASE b.dismissed_player
+                       WHEN s.player_name THEN b.striker_id
+                       WHEN n.player_name THEN b.non_striker_id
+                   END AS player_id,
+                   arg_min(b.dismissal_kind, CAST(b."over" AS INTEGER) * 1000 + b.ball) AS dismissal_kind
+            FROM balls b
+            LEFT JOIN players s ON s.player_id = b.striker_id
+            LEFT JOIN players n ON n.player_id = b.non_striker_id
+            WHERE b.dismissal_kind IS NOT NULL AND b.dismissal_kind NOT IN {NOT_OUT_KINDS}
+            GROUP BY ALL
+        ),
+        batters AS (
+            SELECT match_id, innings, player_id FROM faced
+            UNION
+            SELECT match_id, innings, player_id FROM dismissals WHERE player_id IS NOT NULL
+        )
+        SELECT t.match_id, t.innings, t.player_id,
+               i.batting_team_id AS team_id,
+               {FIELDING_TEAM} AS opponent_team_id,
+               m.match_type, m.date_start, m.venue,
+               CAST(coalesce(f.runs, 0) AS INTEGER) AS runs,
+               CAST(coalesce(f.balls, 0) AS INTEGER) AS balls,
+               CAST(coalesce(f.fours, 0) AS INTEGER) AS fours,
+               CAST(coalesce(f.sixes, 0) AS INTEGER) AS sixes,
+               d.player_id IS NOT NULL AS out,
+               d.dismissal_kind
+        FROM batters t
+        LEFT JOIN faced f USING (match_id, innings, player_id)
+        LEFT JOIN dismissals d USING (match_id, innings, player_id)
+        JOIN matches m USING (match_id)
+        LEFT JOIN match_innings i USING (match_id, innings)
+        ORDER BY {INNINGS_ORDER}
+    """
+
+
+def bowling_innings(balls, matches=None):
+    """One row per bowler per innings: legal balls, runs conceded, wickets, maidens.
+
+    Byes and leg byes aren't charged to the bowler. A no ball that also ran
+    byes only has one combined runs_extras, which is charged in full.
+    """
+    return f"""
+        WITH balls AS (
+            SELECT *,
+                   NOT ({WIDE} OR {NO_BALL}) AS legal,
+                   runs_batsman + CASE WHEN {WIDE} OR {NO_BALL} THEN runs_extras ELSE 0 END AS conceded
+            FROM {balls} {_match_filter(matches)}
+        ),
+        overs AS (
+            SELECT match_id, innings, "over", bowler_id AS player_id,
+                   COUNT(*) FILTER (WHERE legal) AS balls,
+                   SUM(conceded) AS runs,
+                   COUNT(*) FILTER (WHERE dismissal_kind IN {BOWLER_WICKETS}) AS wickets,
+                   COUNT(*) FILTER (WHERE legal AND runs_total = 0) AS dots,
+                   SUM(four) AS fours,
+                   SUM(six) AS sixes
+            FROM balls
+            GROUP BY ALL
+        )
+        SELECT o.match_id, o.innings, o.player_id,
+               {FIELDING_TEAM} AS team_id,
+               i.batting_team_id AS opponent_team_id,
+               m.match_type, m.date_start, m.venue,
+               CAST(SUM(o.balls) AS INTEGER) AS balls,
+               CAST(SUM(o.runs) AS INTEGER) AS runs_conceded,
+               CAST(SUM(o.wickets) AS INTEGER) AS wickets,
+               CAST(COUNT(*) FILTER (WHERE o.balls >= 6 AND o.runs = 0) AS INTEGER) AS maidens,
+               CAST(SUM(o.dots) AS INTEGER) AS dots,
+               CAST(SUM(o.fours) AS INTEGER) AS fours,
+               CAST(SUM(o.sixes) AS INTEGER) AS sixes
+        FROM overs o
+        JOIN matches m USING (match_id)
+        LEFT JOIN match_innings i USING (match_id, innings)
+        GROUP BY ALL
+        ORDER BY {INNINGS_ORDER}
+    """
+
+
+def _player_filter(players):
+    return f"WHERE player_id IN ({players})" if players else ""
+
+
+def batting_career(players=None):
+    """Batting totals per player, format, year, opponent and venue, from batting_innings.
+
+    Every column except highest is a plain sum, so coarser rollups (a whole
+    career, a year across formats) are a SUM over these rows.
+    """
+    return f"""
+        SELECT player_id, match_type, CAST(year(date_start) AS SMALLINT) AS year, opponent_team_id, venue,
+               COUNT(DISTINCT match_id) AS matches,
+               COUNT(*) AS innings,
+               COUNT(*) FILTER (WHERE NOT out) AS not_outs,
+               CAST(SUM(runs) AS INTEGER) AS runs,
+               CAST(SUM(balls) AS INTEGER) AS balls,
+               CAST(SUM(fours) AS INTEGER) AS fours,
+               CAST(SUM(sixes) AS INTEGER) AS sixes,
+               COUNT(*) FILTER (WHERE runs >= 100) AS hundreds,
+               COUNT(*) FILTER (WHERE runs >= 50 AND runs < 100) AS fifties,
+               COUNT(*) FILTER (WHERE runs = 0 AND out) AS ducks,
+               MAX(runs) AS highest
+        FROM batting_innings
+        {_player_filter(players)}
+        GROUP BY ALL
+        ORDER BY {CAREER_ORDER}
+    """
+
+
+def bowling_career(players=None):
+    """Bowling totals per player, format, year, opponent and venue, from bowling_innings.
+
+    best_wickets/best_runs are the best figures within the row; all other
+    columns are plain sums.
+    """
+    return f"""
+        SELECT player_id, match_type, CAST(year(date_start) AS SMALLINT) AS year, opponent_team_id, venue,
+               COUNT(DISTINCT match_id) AS matches,
+               COUNT(*) AS innings,
+               CAST(SUM(balls) AS INTEGER) AS balls,
+               CAST(SUM(runs_conceded) AS INTEGER) AS runs_conceded,
+               CAST(SUM(wickets) AS INTEGER) AS wickets,
+               CAST(SUM(maidens) AS INTEGER) AS maidens,
+               CAST(SUM(dots) AS INTEGER) AS dots,
+               COUNT(*) FILTER (WHERE wickets >= 5) AS five_wickets,
+               MAX(wickets) AS best_wickets,
+               arg_max(runs_conceded, wickets * 10000 - runs_conceded) AS best_runs
+        FROM bowling_innings
+        {_player_filter(players)}
+        GROUP BY ALL
+        ORDER BY {CAREER_ORDER}
+    """
+
+
+# Build order: the career tables read the innings tables
+INNINGS_TABLES = {"batting_innings": batting_innings, "bowling_innings": bowling_innings}
+CAREER_TABLES = {"batting_career": batting_career, "bowling_career": bowling_career}
@@ -0,0 +1,82 @@
+# Declared DuckDB schema for cricket.duckdb, used by setup_duckdb.py instead
+# of read_csv_auto sniffing. Column order matches the pipeline's output files.
+
+# ENUM types: the values Cricsheet documents, plus whatever else the loader
+# finds in the data, so an unexpected value extends the type instead of
+# failing the load. extra_type holds the comma-joined extras of a delivery
+# (e.g. "noballs,legbyes"), so its combinations are always discovered.
+ENUMS = {
+    "match_type_t": ["Test", "ODI", "T20", "IT20", "ODM", "MDM"],
+    "toss_decision_t": ["bat", "field"],
+    "extra_type_t": ["byes", "legbyes", "noballs", "penalty", "wides"],
+}
+
+MATCHES = [
+    ("match_id", "VARCHAR"),
+    ("match_type", "match_type_t"),
+    ("date_start", "DATE"),
+    ("venue", "VARCHAR"),
+    ("city", "VARCHAR"),
+    ("country", "VARCHAR"),
+    ("toss_winner", "VARCHAR"),
+    ("toss_decision", "toss_decision_t"),
+    ("player_of_match", "VARCHAR"),
+    ("series_name", "VARCHAR"),
+    ("result", "VARCHAR"),
+    ("winner", "VARCHAR"),
+    ("match_url", "VARCHAR"),
+    ("home_team_id", "INTEGER"),
+    ("away_team_id", "INTEGER"),
+]
+
+# The narrow ball_by_ball.csv (the deliveries table in --view mode)
+DELIVERIES = [
+    ("match_id", "VARCHAR"),
+    ("innings", "TINYINT"),
+    ("over", "SMALLINT"),
+    ("ball", "SMALLINT"),
+    ("runs_batsman", "SMALLINT"),
+    ("runs_extras", "SMALLINT"),
+    ("runs_total", "SMALLINT"),
+    ("extra_type", "extra_type_t"),
+    ("dismissal_kind", "VARCHAR"),
+    ("dismissed_player", "VARCHAR"),
+    ("six", "TINYINT"),
+    ("four", "TINYINT"),
+    ("striker_id", "INTEGER"),
+    ("bowler_id", "INTEGER"),
+    ("non_striker_id", "INTEGER"),
+]
+
+# ultimate_ball_by_ball.csv: deliveries joined with their match
+BALL_BY_BALL = DELIVERIES + MATCHES[1:] + [("match_format", "match_type_t")]
+
+PLAYERS = [
+    ("player_id", "INTEGER"),
+    ("player_name", "VARCHAR"),
+    ("batting_hand", "VARCHAR"),
+    ("bowling_style", "VARCHAR"),
+    ("country", "VARCHAR"),
+    ("cricsheet_id", "VARCHAR"),
+]
+
+TEAMS = [
+    ("team_id", "INTEGER"),
+    ("team_name", "VARCHAR"),
+    ("country", "VARCHAR"),
+]
+
+# The batting team of each innings; the aggregate tables use it for
+# each player's team and opponent
+MATCH_INNINGS = [
+    ("match_id", "VARCHAR"),
+    ("innings", "TINYINT"),
+    ("batting_team_id", "INTEGER"),
+]
+
+# Where each ENUM's extra values are discovered: (output name, column)
+ENUM_SOURCES = {
+    "match_type_t": [("matches_metadata", "match_type")],
+    "toss_decision_t": [("matches_metadata", "toss_decision")],
+    "extra_type_t": [("ball_by_ball", "extra_type")],
+}
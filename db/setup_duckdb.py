@@ -1,51 +1,342 @@
 # scripts/load_duckdb.py
 import duckdb
 import os
+import sys
+import shutil
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from instrumentation import RunReport
+from parquet_export import denormalized_ball_by_ball
+import schema
+import aggregates
 
 OUTPUT_DIR = "output"
+PARQUET_DIR = os.path.join(OUTPUT_DIR, "parquet")
 DB_FILE = "cricket.duckdb"
+# Every load is built in a private file and then renamed over DB_FILE, never
+# written in place. Readers (the agent's read-only DuckDBPool) keep their
+# shared lock on the old file without blocking the load, see either the
+# previous load or the new one, and reopen when the file changes.
+BUILD_FILE = f"{DB_FILE}.{os.getpid()}.tmp"
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.csv")
+
+parser = argparse.ArgumentParser(description="Load the pipeline outputs into cricket.duckdb")
+parser.add_argument("--parquet", action="store_true",
+                    help="load the typed Parquet outputs instead of the CSVs")
+parser.add_argument("--view", action="store_true",
+                    help="load the narrow ball_by_ball output as table deliveries and define ball_by_ball "
+                         "as a view joining it with matches (no ultimate_ball_by_ball needed)")
+parser.add_argument("--memory-limit", default="1GB",
+                    help="DuckDB memory limit while loading; sorting ball_by_ball spills to disk beyond it (default: 1GB)")
+parser.add_argument("--incremental", action="store_true",
+                    help="only load matches that are new, changed or removed since the last load, in one transaction")
+args = parser.parse_args()
+
+report = RunReport("setup_duckdb", OUTPUT_DIR)
+
+# Declared column types per output; ENUM columns are read as VARCHAR and cast
+SCHEMAS = {
+    "ultimate_ball_by_ball": schema.BALL_BY_BALL,
+    "ball_by_ball": schema.DELIVERIES,
+    "matches_metadata": schema.MATCHES,
+    "players": schema.PLAYERS,
+    "teams": schema.TEAMS,
+    "match_innings": schema.MATCH_INNINGS,
+}
+
+def raw_source(name):
+    """Table expression for an output with its declared columns, ENUMs still as VARCHAR.
+
+    CSVs are read with the declared column list and no sniffing; a header
+    that doesn't match the schema stops the load instead of guessing.
+    """
+    columns = SCHEMAS[name]
+    if not args.parquet:
+        path = os.path.join(OUTPUT_DIR, name + ".csv")
+        with open(path, encoding="utf-8") as f:
+            header = f.readline().rstrip("\r\n").split(",")
+        expected = [col for col, _ in columns]
+        if header != expected:
+            raise SystemExit(f"❌ {path} does not match the declared schema:\n  got      {header}\n  expected {expected}")
+        types = ", ".join(f"'{col}': '{'VARCHAR' if kind in schema.ENUMS else kind}'" for col, kind in columns)
+        return f"read_csv('{path}', header=true, auto_detect=false, columns={{{types}}})"
+    partitioned = os.path.join(PARQUET_DIR, name)
+    if os.path.isdir(partitioned):
+        # year is only a partition key, not a column of the original table
+        return f"read_parquet('{partitioned}/**/*.parquet', hive_partitioning=true)"
+    return f"read_parquet('{partitioned}.parquet')"
+
+def source(name):
+    """SELECT of an output with exactly the declared columns and types."""
+    casts = ", ".join(f'CAST("{col}" AS {kind}) AS "{col}"' for col, kind in SCHEMAS[name])
+    return f"(SELECT {casts} FROM {raw_source(name)})"
+
+def create_enums():
+    """(Re)create the ENUM types: documented values plus any others in the data."""
+    for enum, known in schema.ENUMS.items():
+        values = list(known)
+        for name, column in schema.ENUM_SOURCES[enum]:
+            found = con.execute(f'SELECT DISTINCT "{column}" FROM {raw_source(name)} '
+                                f'WHERE "{column}" IS NOT NULL ORDER BY 1').fetchall()
+            values += [value for (value,) in found if value not in values]
+        con.execute(f"DROP TYPE IF EXISTS {enum}")
+        labels = ", ".join("'" + value.replace("'", "''") + "'" for value in values)
+        con.execute(f"CREATE TYPE {enum} AS ENUM ({labels})")
+        report.count(f"enum_{enum}", len(values))
+
+# No ART indexes: the agent's queries are scans and aggregations, which
+# DuckDB serves from min/max zone maps per row group. Deliveries are written
+# in this order so format, date and match filters skip whole row groups.
+BALL_ORDER = "match_type, date_start, match_id, innings, over, ball"
+MATCH_ORDER = "match_type, date_start, match_id"
+
+# ball_by_ball is either a table loaded from ultimate_ball_by_ball, or (--view)
+# a view with the same columns over the narrow deliveries table and matches
+if args.view:
+    BALL_TABLE, BALL_SOURCE = "deliveries", "ball_by_ball"
+    # deliveries has no match_type/date_start of its own; sort by its match's
+    BALL_JOIN = "LEFT JOIN matches m USING (match_id)"
+    BALL_SORT = "m.match_type, m.date_start, t.match_id, t.innings, t.over, t.ball"
+else:
+    BALL_TABLE, BALL_SOURCE, BALL_JOIN, BALL_SORT = "ball_by_ball", "ultimate_ball_by_ball", "", BALL_ORDER
+
+def load_table(table, name, order_by=None, join=""):
+    """CREATE OR REPLACE table from an output, optionally sorted (join can bring in sort keys)."""
+    with report.stage(f"load_{table}"):
+        con.execute(f"""
+        CREATE OR REPLACE TABLE {table} AS
+        SELECT t.* FROM {source(name)} t {join}
+        {f"ORDER BY {order_by}" if order_by else ""};
+        """)
+        report.count(f"rows_{table}", con.execute(f"SELECT count(*) FROM {table}").fetchone()[0])
+
+def insert_rows(table, query):
+    """Append the result of query to table."""
+    with report.stage(f"insert_{table}"):
+        rows = con.execute(f"INSERT INTO {table} {query}").fetchone()[0]
+        report.count(f"rows_inserted_{table}", rows)
+
+# Per-match content hashes from parse_cricsheet's manifest. The load_manifest
+# table records what the database holds, so an incremental load only touches
+# matches whose hash differs.
+def source_manifest():
+    columns = "{'source_file': 'VARCHAR', 'size': 'VARCHAR', 'mtime_ns': 'VARCHAR', " \
+              "'content_hash': 'VARCHAR', 'match_id': 'VARCHAR'}"
+    return f"""
+        SELECT DISTINCT match_id, content_hash
+        FROM read_csv('{MANIFEST_FILE}', header=true, auto_detect=false, columns={columns})
+    """
+
+def build_aggregates():
+    """(Re)create the aggregate tables from the loaded ball table."""
+    for table, select in aggregates.INNINGS_TABLES.items():
+        with report.stage(f"aggregate_{table}"):
+            con.execute(f"CREATE OR REPLACE TABLE {table} AS {select(BALL_TABLE)}")
+            report.count(f"rows_{table}", con.execute(f"SELECT count(*) FROM {table}").fetchone()[0])
+    for table, select in aggregates.CAREER_TABLES.items():
+        with report.stage(f"aggregate_{table}"):
+            con.execute(f"CREATE OR REPLACE TABLE {table} AS {select()}")
+            report.count(f"rows_{table}", con.execute(f"SELECT count(*) FROM {table}").fetchone()[0])
+
+def refresh_aggregates():
+    """Recompute the innings of stale matches and the careers of everyone who played in them."""
+    stale = "SELECT match_id FROM stale_matches"
+    changed = "SELECT match_id FROM changed_matches"
+    with report.stage("aggregates"):
+        # Players of the old rows, before they are deleted, and of the new ones
+        con.execute("CREATE OR REPLACE TEMP TABLE affected_players (player_id INTEGER)")
+        for table, select in aggregates.INNINGS_TABLES.items():
+            con.execute(f"INSERT INTO affected_players SELECT player_id FROM {table} WHERE match_id IN ({stale})")
+            con.execute(f"DELETE FROM {table} WHERE match_id IN ({stale})")
+            con.execute(f"INSERT INTO {table} {select(BALL_TABLE, changed)}")
+            con.execute(f"INSERT INTO affected_players SELECT player_id FROM {table} WHERE match_id IN ({changed})")
+        players = "SELECT DISTINCT player_id FROM affected_players"
+        for table, select in aggregates.CAREER_TABLES.items():
+            con.execute(f"DELETE FROM {table} WHERE player_id IN ({players})")
+            con.execute(f"INSERT INTO {table} {select(players)}")
+        report.count("aggregate_players", con.execute(f"SELECT count(*) FROM ({players})").fetchone()[0])
+
+def record_load(mode):
+    """Append this load to load_history; its load_id tells readers (e.g. the agent's SQL cache) the data changed.
+
+    version counts loads within one file and starts again at 1 when the
+    database is rebuilt from scratch, so readers key on load_id, a random
+    UUID that no other load shares.
+    """
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS load_history (version INTEGER, loaded_at TIMESTAMP, mode VARCHAR, load_id UUID)
+    """)
+    con.execute("ALTER TABLE load_history ADD COLUMN IF NOT EXISTS load_id UUID")
+    # mode is "full" or "incremental"; inlined because binding a parameter
+    # makes the duckdb module import pandas and numpy (~0.3 s)
+    version, load_id = con.execute(f"""
+    INSERT INTO load_history
+    SELECT coalesce(max(version), 0) + 1, now()::TIMESTAMP, '{mode}', gen_random_uuid() FROM load_history
+    RETURNING version, load_id
+    """).fetchone()
+    report.count("load_version", version)
+    print(f"🏷️ Load {version} ({mode}), load_id {load_id}")
 
-# Connect to (or create) the DuckDB database
-con = duckdb.connect(DB_FILE)
+def full_load():
+    existing = con.execute(
+        "SELECT table_type FROM information_schema.tables WHERE table_name = 'ball_by_ball'").fetchone()
+    if existing:
+        con.execute(f"DROP {'VIEW' if existing[0] == 'VIEW' else 'TABLE'} ball_by_ball")
+    con.execute("DROP TABLE IF EXISTS deliveries")
+    # Tables using the ENUM types go before the types are recreated
+    for table in [*aggregates.CAREER_TABLES, *aggregates.INNINGS_TABLES, "matches"]:
+        con.execute(f"DROP TABLE IF EXISTS {table}")
+    with report.stage("enums"):
+        create_enums()
+
+    # Load players
+    load_table("players", "players")
+
+    # Load teams
+    load_table("teams", "teams")
+
+    # Load matches summary
+    load_table("matches", "matches_metadata", order_by=MATCH_ORDER)
+    load_table("match_innings", "match_innings", order_by="match_id, innings")
+
+    # Load ball-by-ball data, clustered by format and date
+    load_table(BALL_TABLE, BALL_SOURCE, order_by=BALL_SORT, join=BALL_JOIN)
+    if args.view:
+        con.execute(f"CREATE VIEW ball_by_ball AS {denormalized_ball_by_ball('deliveries', 'matches')}")
+        print("🔗 ball_by_ball is a view over deliveries + matches")
+
+    build_aggregates()
+
+    if os.path.exists(MANIFEST_FILE):
+        con.execute(f"CREATE OR REPLACE TABLE load_manifest AS {source_manifest()}")
+    else:
+        con.execute("CREATE OR REPLACE TABLE load_manifest (match_id VARCHAR, content_hash VARCHAR)")
+
+def incremental_load():
+    """Replace only new, changed and removed matches; returns False if a full load is needed.
+
+    Runs on a copy of the current database, and deletes and inserts run in
+    one transaction, so a failed load leaves nothing half-applied. The
+    database work scales with the number of changed matches; the outputs
+    are still scanned to find their rows. Copying the file is the one step
+    that grows with the database itself; it is a plain sequential copy,
+    reported as the copy stage and copy_bytes.
+    """
+    tables = dict(con.execute("SELECT table_name, table_type FROM information_schema.tables").fetchall())
+    layout_ok = tables.get("ball_by_ball") == ("VIEW" if args.view else "BASE TABLE")
+    required = [BALL_TABLE, "matches", "match_innings", "players", "teams", "load_manifest",
+                *aggregates.INNINGS_TABLES, *aggregates.CAREER_TABLES]
+    if not layout_ok or any(tables.get(t) != "BASE TABLE" for t in required):
+        print("⚠️ No previous load with this layout, doing a full load")
+        return False
+    if not os.path.exists(MANIFEST_FILE):
+        print(f"⚠️ {MANIFEST_FILE} not found, doing a full load")
+        return False
+
+    with report.stage("diff"):
+        con.execute(f"CREATE OR REPLACE TEMP TABLE source_manifest AS {source_manifest()}")
+        con.execute("""
+        CREATE OR REPLACE TEMP TABLE changed_matches AS
+        SELECT match_id FROM (
+            SELECT match_id, content_hash FROM source_manifest
+            EXCEPT SELECT match_id, content_hash FROM load_manifest)
+        """)
+        con.execute("""
+        CREATE OR REPLACE TEMP TABLE stale_matches AS
+        SELECT match_id FROM changed_matches
+        UNION SELECT match_id FROM load_manifest WHERE match_id NOT IN (SELECT match_id FROM source_manifest)
+        """)
+        changed = con.execute("SELECT count(*) FROM changed_matches").fetchone()[0]
+        stale = con.execute("SELECT count(*) FROM stale_matches").fetchone()[0]
+    print(f"🔄 {changed} new or changed matches, {stale - changed} removed")
+    report.count("matches_changed", changed)
+    report.count("matches_removed", stale - changed)
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        with report.stage("delete"):
+            for table in (BALL_TABLE, "matches", "match_innings", "load_manifest"):
+                con.execute(f"DELETE FROM {table} WHERE match_id IN (SELECT match_id FROM stale_matches)")
+        # players.csv and teams.csv are append-only dictionaries keyed by ID
+        insert_rows("players", f"SELECT * FROM {source('players')} WHERE player_id NOT IN (SELECT player_id FROM players)")
+        insert_rows("teams", f"SELECT * FROM {source('teams')} WHERE team_id NOT IN (SELECT team_id FROM teams)")
+        changed_rows = "WHERE match_id IN (SELECT match_id FROM changed_matches)"
+        insert_rows("matches", f"SELECT * FROM {source('matches_metadata')} {changed_rows} ORDER BY {MATCH_ORDER}")
+        insert_rows("match_innings", f"SELECT * FROM {source('match_innings')} {changed_rows} ORDER BY match_id, innings")
+        new_balls = f"(SELECT * FROM {source('ball_by_ball')} {changed_rows})"
+        if args.view:
+            insert_rows("deliveries", f"SELECT t.* FROM {new_balls} t {BALL_JOIN} ORDER BY {BALL_SORT}")
+        else:
+            # Same rows as ultimate_ball_by_ball, joined here from the narrow
+            # output and the matches just inserted: a quarter of the bytes to scan
+            query = denormalized_ball_by_ball(new_balls, "matches")
+            insert_rows("ball_by_ball", f"SELECT * FROM ({query}) ORDER BY {BALL_ORDER}")
+        refresh_aggregates()
+        con.execute("""
+        INSERT INTO load_manifest
+        SELECT * FROM source_manifest WHERE match_id IN (SELECT match_id FROM changed_matches)
+        """)
+        record_load("incremental")
+        con.execute("COMMIT")
+    except duckdb.ConversionException as e:
+        # e.g. a match_type or extra_type the ENUM types don't know yet
+        con.execute("ROLLBACK")
+        print(f"⚠️ New rows don't fit the current column types ({str(e).splitlines()[0]}), doing a full load")
+        return False
+    return True
+
+def remove_build_file():
+    for path in (BUILD_FILE, BUILD_FILE + ".wal"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def connect_build_file(copy_current):
+    """Open BUILD_FILE, starting from a copy of DB_FILE if copy_current, else empty."""
+    remove_build_file()
+    if copy_current:
+        with report.stage("copy"):
+            shutil.copyfile(DB_FILE, BUILD_FILE)
+            report.count("copy_bytes", os.path.getsize(BUILD_FILE))
+    connection = duckdb.connect(BUILD_FILE)
+    connection.execute(f"SET memory_limit = '{args.memory_limit}'")
+    return connection
+
+# An incremental load starts from a copy of the current database. A leftover
+# WAL means the last writer didn't close cleanly and the file alone isn't the
+# whole database, so that case rebuilds from the outputs instead.
+copy_current = args.incremental and os.path.exists(DB_FILE)
+if copy_current and os.path.exists(DB_FILE + ".wal"):
+    print(f"⚠️ {DB_FILE}.wal exists, doing a full load into a new file")
+    copy_current = False
+con = connect_build_file(copy_current)
 
 # Check what CSV files exist
 print("Available CSV files:")
 for file in os.listdir(OUTPUT_DIR):
     if file.endswith('.csv'):
         print(f"  - {file}")
+if args.parquet:
+    print("Loading from Parquet outputs in", PARQUET_DIR)
 
-# Load ball-by-ball data
-con.execute(f"""
-CREATE OR REPLACE TABLE ball_by_ball AS
-SELECT * FROM read_csv_auto('{os.path.join(OUTPUT_DIR, "ultimate_ball_by_ball.csv")}', HEADER=TRUE);
-""")
-# Create an index on match_id for faster queries
-print("Creating indexes...")
-con.execute("CREATE INDEX IF NOT EXISTS idx_match_id ON ball_by_ball(match_id)")
-
-# Load players
-con.execute(f"""
-CREATE OR REPLACE TABLE players AS
-SELECT * FROM read_csv_auto('{os.path.join(OUTPUT_DIR, "players.csv")}', HEADER=TRUE);
-""")
-
-# Load teams
-con.execute(f"""
-CREATE OR REPLACE TABLE teams AS
-SELECT * FROM read_csv_auto('{os.path.join(OUTPUT_DIR, "teams.csv")}', HEADER=TRUE);
-""")
-
-# Load matches summary
-con.execute(f"""
-CREATE OR REPLACE TABLE matches AS
-SELECT * FROM read_csv_auto('{os.path.join(OUTPUT_DIR, "matches_metadata.csv")}', HEADER=TRUE);
-""")
-
-con.execute("CREATE INDEX IF NOT EXISTS idx_player_id ON players(player_id)")
-con.execute("CREATE INDEX IF NOT EXISTS idx_team_id ON teams(team_id)")
+try:
+    if not (copy_current and incremental_load()):
+        if copy_current:
+            # Start over from an empty file rather than rewrite every table in the copy
+            con.close()
+            con = connect_build_file(False)
+        full_load()
+        record_load("full")
+    con.close()
+except BaseException:
+    con.close()
+    remove_build_file()
+    raise
+os.replace(BUILD_FILE, DB_FILE)
+if os.path.exists(DB_FILE + ".wal"):
+    os.remove(DB_FILE + ".wal")  # belonged to the file just replaced
 
 print("✅ DuckDB setup complete")
-print("Tables available: ball_by_ball, players, teams, matches")
-
-
-
+print("Tables available: ball_by_ball, players, teams, matches, match_innings, "
+      + ", ".join([*aggregates.INNINGS_TABLES, *aggregates.CAREER_TABLES]) + (", deliveries" if args.view else ""))
+report.write()
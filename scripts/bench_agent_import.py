@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Startup benchmark for agent/cricket_agent.py: wall time of a bare
+# `import cricket_agent` in a fresh interpreter, the modules that cost the
+# most (from python -X importtime), and how long the first get_agent() call
+# takes to build the LLM client and ReAct graph when their packages and key
+# are available.
+#
+#   python scripts/bench_agent_import.py --save bench/agent_import_before.json
+#   ... change cricket_agent.py ...
+#   python scripts/bench_agent_import.py --baseline bench/agent_import_before.json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT_DIR = os.path.join(REPO_DIR, "agent")
+
+# Prints the import and first-build times, in ms, as JSON
+PROBE = """
+import json, time
+start = time.perf_counter()
+import cricket_agent
+imported = time.perf_counter()
+try:
+    cricket_agent.get_agent()
+    build = (time.perf_counter() - imported) * 1000
+except Exception:
+    build = None
+print(json.dumps({"import_ms": (imported - start) * 1000, "build_ms": build}))
+"""
+
+
+def run_probe():
+    """(import ms, first get_agent() ms or None), or None if the import itself failed."""
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=AGENT_DIR, capture_output=True, text=True)
+    if proc.returncode:
+        print(f"  ⚠️ import failed: {proc.stderr.strip().splitlines()[-1]}")
+        return None
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result["import_ms"], result["build_ms"]
+
+
+def slowest_imports(top):
+    """The top modules by cumulative import time (ms) for `import cricket_agent`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import cricket_agent"],
+                          cwd=AGENT_DIR, capture_output=True, text=True)
+    modules = []
+    children = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Children are listed before their parent, two spaces deeper; only
+        # cricket_agent's direct imports count, nested ones are inside their time
+        depth = len(name) - len(name.lstrip())
+        if depth == 3:
+            children.append((name.strip(), int(cumulative) / 1000))
+        elif depth == 1:
+            if name.strip() == "cricket_agent":
+                modules = children
+            children = []
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time and first agent build of cricket_agent")
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters to time, median is reported")
+    parser.add_argument("--top", type=int, default=8, help="slowest imported modules to list")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="earlier --save output to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    runs = [r for r in (run_probe() for _ in range(args.repeat)) if r is not None]
+    if not runs:
+        sys.exit(1)
+    results = {"import_ms": round(statistics.median(r[0] for r in runs), 2)}
+    builds = [r[1] for r in runs if r[1] is not None]
+    results["build_ms"] = round(statistics.median(builds), 2) if builds else None
+
+    print(f"📊 cricket_agent startup, median of {len(runs)} fresh interpreters")
+    for key, label in [("import_ms", "import"), ("build_ms", "first get_agent()")]:
+        if results[key] is None:
+            print(f"{label:20s} {'skipped':>9s}   (langchain packages or GROQ key not available)")
+            continue
+        line = f"{label:20s} {results[key]:9.2f} ms"
+        if baseline.get(key):
+            line += f"   ({baseline[key]:.2f} ms before, {baseline[key] / results[key]:.2f}x)"
+        print(line)
+
+    print(f"\n{'slowest imports':32s} {'ms':>9s}")
+    results["slowest_imports"] = slowest_imports(args.top)
+    for name, ms in results["slowest_imports"]:
+        print(f"{name:32s} {ms:9.2f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results saved in {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import os
+import time
+import argparse
+from glob import glob
+from cricsheet_decoder import decode_match, msgspec
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INPUT = os.path.join(BASE_DIR, "data", "cricsheet")
+
+
+def bench(docs, backend, repeat):
+    """Best-of-repeat wall time to decode every document once."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for raw in docs:
+            decode_match(raw, backend)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-file decode throughput: stdlib json vs msgspec")
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT,
+                        help="directory searched recursively for Cricsheet *.json files")
+    parser.add_argument("--limit", type=int, default=0, help="only use the first N files")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per backend, best is reported")
+    args = parser.parse_args()
+
+    files = sorted(glob(os.path.join(args.input_dir, "**", "*.json"), recursive=True))
+    if args.limit:
+        files = files[:args.limit]
+    if not files:
+        print(f"❌ No JSON files found under {args.input_dir}")
+        return
+
+    # Read everything up front so only decoding is timed
+    docs = []
+    for path in files:
+        with open(path, "rb") as f:
+            docs.append(f.read())
+    total_mb = sum(len(raw) for raw in docs) / 1e6
+    print(f"📂 {len(docs)} files, {total_mb:.1f} MB from {args.input_dir}")
+
+    backends = ["json"]
+    if msgspec is not None:
+        backends.append("msgspec")
+        mismatched = sum(1 for raw in docs if decode_match(raw, "json") != decode_match(raw, "msgspec"))
+        if mismatched:
+            print(f"⚠️ {mismatched} files decode differently between backends")
+    else:
+        print("⚠️ msgspec not installed, only benchmarking the stdlib path")
+
+    results = {}
+    for backend in backends:
+        elapsed = bench(docs, backend, args.repeat)
+        results[backend] = elapsed
+        print(f"⏱️ {backend:8s} {elapsed:8.3f}s  {len(docs) / elapsed:8.1f} files/s  {total_mb / elapsed:7.1f} MB/s")
+
+    if "msgspec" in results:
+        print(f"🚀 msgspec speedup: {results['json'] / results['msgspec']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+
+# Ingest benchmark: runs every pipeline stage on a synthetic corpus in an
+# isolated workspace and reports wall time, deliveries per second and peak
+# RSS per stage.
+#
+#   python scripts/bench_ingest.py --matches 1000
+#   python scripts/bench_ingest.py --matches 10000 --baseline bench/previous.json
+#
+# The workspace (default: bench/) gets its own data/cricsheet, output/ and
+# cricket.duckdb. parse_cricsheet and extract_metadata find it through
+# CRICKET_BASE_DIR; merge_with_metadata and setup_duckdb use paths relative to
+# the working directory, so they are run from inside the workspace.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_DIR, "scripts")
+
+STAGES = [
+    ("parse_cricsheet", os.path.join(SCRIPTS_DIR, "parse_cricsheet.py")),
+    ("extract_metadata", os.path.join(SCRIPTS_DIR, "extract_metadata.py")),
+    ("merge_with_metadata", os.path.join(SCRIPTS_DIR, "merge_with_metadata.py")),
+    ("setup_duckdb", os.path.join(REPO_DIR, "db", "setup_duckdb.py")),
+]
+
+
+def run_stage(name, script, extra_args, workspace, log):
+    """Run one stage as a child process; returns wall seconds and peak RSS in MB.
+
+    os.wait4 gives the rusage of exactly this child. On Linux its ru_maxrss
+    also covers any pool workers the stage waited for, so it's the peak of
+    the largest process in the stage.
+    """
+    env = dict(os.environ, CRICKET_BASE_DIR=workspace)
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, script] + extra_args, cwd=workspace, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} failed with exit code {proc.returncode}, see {log.name}")
+    return elapsed, usage.ru_maxrss / 1024
+
+
+def count_rows(csv_path):
+    with open(csv_path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingest pipeline on a synthetic corpus")
+    parser.add_argument("--matches", type=int, default=1000, help="corpus size (default: 1000)")
+    parser.add_argument("--workspace", default=os.path.join(REPO_DIR, "bench"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--zip", action="store_true", help="benchmark parsing from zip archives")
+    parser.add_argument("--workers", type=int, default=1, help="parse_cricsheet --workers")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the corpus even if it exists")
+    parser.add_argument("--baseline", help="earlier bench_ingest.json to compare against")
+    args = parser.parse_args()
+
+    workspace = os.path.abspath(args.workspace)
+    corpus = os.path.join(workspace, "data", "cricsheet")
+    corpus_tag = f"{args.matches} matches, seed {args.seed}, {'zip' if args.zip else 'files'}"
+    tag_file = os.path.join(corpus, "CORPUS")
+
+    existing = open(tag_file).read() if os.path.exists(tag_file) else None
+    if args.regenerate or existing != corpus_tag:
+        shutil.rmtree(corpus, ignore_errors=True)
+        print(f"🧪 Generating corpus: {corpus_tag}")
+        generate = [sys.executable, os.path.join(SCRIPTS_DIR, "generate_synthetic_cricsheet.py"),
+                    "--matches", str(args.matches), "--seed", str(args.seed), "--output-dir", corpus]
+        if args.zip:
+            generate.append("--zip")
+        subprocess.run(generate, check=True)
+        with open(tag_file, "w") as f:
+            f.write(corpus_tag)
+
+    # Start every run from a clean output so parse is a full rebuild
+    shutil.rmtree(os.path.join(workspace, "output"), ignore_errors=True)
+    db_file = os.path.join(workspace, "cricket.duckdb")
+    if os.path.exists(db_file):
+        os.remove(db_file)
+
+    stage_args = {"parse_cricsheet": ["--workers", str(args.workers)]}
+    results = []
+    deliveries = None
+    with open(os.path.join(workspace, "bench_ingest.log"), "w") as log:
+        for name, script in STAGES:
+            print(f"⏱️ Running {name}...")
+            elapsed, peak_mb = run_stage(name, script, stage_args.get(name, []), workspace, log)
+            if deliveries is None:
+                deliveries = count_rows(os.path.join(workspace, "output", "raw", "ball_by_ball.csv"))
+            results.append({
+                "stage": name,
+                "wall_seconds": round(elapsed, 3),
+                "rows": deliveries,
+                "rows_per_second": round(deliveries / elapsed, 1) if elapsed else None,
+                "peak_rss_mb": round(peak_mb, 1),
+            })
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["stage"]: r for r in json.load(f)["stages"]}
+
+    print(f"\n📊 {corpus_tag}, {deliveries} deliveries")
+    print(f"{'stage':22s} {'wall s':>9s} {'rows/s':>12s} {'peak MB':>9s}")
+    for r in results:
+        line = f"{r['stage']:22s} {r['wall_seconds']:9.2f} {r['rows_per_second']:12,.0f} {r['peak_rss_mb']:9.1f}"
+        before = baseline.get(r["stage"])
+        if before:
+            line += f"   ({r['wall_seconds'] / before['wall_seconds'] - 1:+.0%} time, " \
+                    f"{r['peak_rss_mb'] / before['peak_rss_mb'] - 1:+.0%} memory vs baseline)"
+        print(line)
+
+    report = {"corpus": corpus_tag, "deliveries": deliveries, "workers": args.workers, "stages": results}
+    report_file = os.path.join(workspace, "bench_ingest.json")
+    with open(report_file, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report saved in {report_file}")
+
+
+if __name__ == "__main__":
+    main()
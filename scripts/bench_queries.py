@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import argparse
+import statistics
+import duckdb
+
+# Query benchmark: runs the kind of SQL the agent generates against
+# cricket.duckdb and reports the median latency per query.
+#
+#   python scripts/bench_queries.py --save bench/queries_before.json
+#   ... reload the database with a different layout ...
+#   python scripts/bench_queries.py --baseline bench/queries_before.json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Career totals scan everything; format/date filters and single-match
+# lookups are where the table's physical order matters.
+QUERIES = {
+    "career_runs": """
+        SELECT p.player_name, SUM(b.runs_batsman) AS runs
+        FROM ball_by_ball b JOIN players p ON b.striker_id = p.player_id
+        GROUP BY p.player_id, p.player_name ORDER BY runs DESC LIMIT 10
+    """,
+    "most_matches": """
+        SELECT p.player_name, COUNT(DISTINCT b.match_id) AS matches
+        FROM ball_by_ball b JOIN players p ON b.striker_id = p.player_id
+        GROUP BY p.player_id, p.player_name ORDER BY matches DESC LIMIT 10
+    """,
+    "test_runs_since_2015": """
+        SELECT p.player_name, SUM(b.runs_batsman) AS runs
+        FROM ball_by_ball b JOIN players p ON b.striker_id = p.player_id
+        WHERE b.match_type = 'Test' AND b.date_start >= '2015-01-01'
+        GROUP BY p.player_id, p.player_name ORDER BY runs DESC LIMIT 10
+    """,
+    "odi_economy_one_year": """
+        SELECT p.player_name, SUM(b.runs_total) * 6.0 / COUNT(*) AS economy
+        FROM ball_by_ball b JOIN players p ON b.bowler_id = p.player_id
+        WHERE b.match_type = 'ODI' AND b.date_start BETWEEN '2010-01-01' AND '2010-12-31'
+        GROUP BY p.player_id, p.player_name HAVING COUNT(*) >= 120 ORDER BY economy LIMIT 10
+    """,
+    "t20_sixes_by_year": """
+        SELECT year(date_start) AS year, SUM(six) AS sixes
+        FROM ball_by_ball WHERE match_type = 'T20'
+        GROUP BY year ORDER BY year
+    """,
+    "venue_runs": """
+        SELECT venue, SUM(runs_total) AS runs, COUNT(DISTINCT match_id) AS matches
+        FROM ball_by_ball WHERE venue = 'Lord''s' GROUP BY venue
+    """,
+    "match_scorecard": """
+        SELECT innings, p.player_name, SUM(b.runs_batsman) AS runs, COUNT(*) AS balls
+        FROM ball_by_ball b JOIN players p ON b.striker_id = p.player_id
+        WHERE b.match_id = (SELECT max(match_id) FROM matches)
+        GROUP BY innings, p.player_id, p.player_name ORDER BY innings, runs DESC
+    """,
+    # The same kind of questions answered from setup_duckdb's aggregate tables
+    "career_runs_aggregate": """
+        SELECT p.player_name, SUM(c.runs) AS runs
+        FROM batting_career c JOIN players p USING (player_id)
+        GROUP BY p.player_id, p.player_name ORDER BY runs DESC LIMIT 10
+    """,
+    "test_hundreds_aggregate": """
+        SELECT p.player_name, SUM(c.hundreds) AS hundreds
+        FROM batting_career c JOIN players p USING (player_id)
+        WHERE c.match_type = 'Test'
+        GROUP BY p.player_id, p.player_name ORDER BY hundreds DESC LIMIT 10
+    """,
+}
+
+
+def bench(con, sql, repeat):
+    """Median wall time over repeat runs, after one warm-up run."""
+    con.execute(sql).fetchall()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        con.execute(sql).fetchall()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark typical agent queries against cricket.duckdb")
+    parser.add_argument("--db", default=os.path.join(REPO_DIR, "cricket.duckdb"))
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per query, median is reported")
+    parser.add_argument("--threads", type=int, help="DuckDB threads (default: DuckDB's own)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="earlier --save output to compare against")
+    args = parser.parse_args()
+
+    con = duckdb.connect(args.db, read_only=True)
+    if args.threads:
+        con.execute(f"SET threads = {args.threads}")
+    rows = con.execute("SELECT count(*) FROM ball_by_ball").fetchone()[0]
+    indexes = con.execute("SELECT count(*) FROM duckdb_indexes()").fetchone()[0]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["queries"]
+
+    print(f"📊 {args.db}: {rows:,} deliveries, {indexes} indexes, median of {args.repeat} runs")
+    print(f"{'query':24s} {'ms':>9s}")
+    results = {}
+    for name, sql in QUERIES.items():
+        try:
+            seconds = bench(con, sql, args.repeat)
+        except duckdb.CatalogException:
+            print(f"{name:24s} {'skipped':>9s}   (table not in this database)")
+            continue
+        results[name] = round(seconds * 1000, 2)
+        line = f"{name:24s} {results[name]:9.2f}"
+        if name in baseline:
+            line += f"   ({baseline[name]:.2f} ms before, {baseline[name] / results[name]:.2f}x)"
+        print(line)
+    con.close()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"db": args.db, "deliveries": rows, "indexes": indexes, "queries": results}, f, indent=2)
+        print(f"📄 Results saved in {args.save}")
+
+
+if __name__ == "__main__":
+    main()
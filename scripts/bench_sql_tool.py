@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import threading
+import duckdb
+
+# Per-call latency of cricket_sql_tool's database access: a fresh
+# duckdb.connect() + close() per call (the old behaviour) against the agent's
+# shared DuckDBPool, then bench_queries' scans through the ResultCache, each
+# re-issued with different spacing and case as the agent tends to, and finally
+# wide unbounded SELECTs fetched whole against FetchBudget's pushed-down LIMIT.
+#
+#   python scripts/bench_sql_tool.py --db cricket.duckdb --calls 200 --threads 4
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "agent"))
+from duckdb_pool import DuckDBPool
+from result_cache import ResultCache
+from sql_fetch import FetchBudget
+from bench_queries import QUERIES as SCANS
+
+# Small lookups, where opening the database dominates the call
+QUERIES = [
+    "SELECT count(*) FROM players",
+    "SELECT team_name FROM teams ORDER BY team_id LIMIT 5",
+    "SELECT match_id, venue, winner FROM matches ORDER BY date_start DESC LIMIT 10",
+]
+
+
+def connect_per_call(db):
+    def run(sql):
+        conn = duckdb.connect(db)
+        conn.execute(sql).fetchall()
+        conn.close()
+    return run
+
+
+def pooled(db):
+    pool = DuckDBPool(db)
+    def run(sql):
+        with pool.cursor() as cur:
+            cur.execute(sql).fetchall()
+    return run
+
+
+def bench(run, calls, threads):
+    """Per-call latencies (ms) and failed calls, for calls spread over threads, after one warm-up call."""
+    run(QUERIES[0])
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(n):
+        mine = []
+        for i in range(n):
+            start = time.perf_counter()
+            try:
+                run(QUERIES[i % len(QUERIES)])
+            except duckdb.Error as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            mine.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=worker, args=(calls // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def respelled(sql):
+    """The same query as the agent might re-issue it: other spacing, case and a comment."""
+    # Uppercase everything outside string literals (even segments between quotes)
+    parts = " ".join(sql.split()).split("'")
+    return "-- retry\n" + "'".join(p.upper() if i % 2 == 0 else p for i, p in enumerate(parts)) + ";"
+
+
+def bench_cache(db):
+    """(name, cold ms, warm ms) per scan query, plus the cache's counters."""
+    pool = DuckDBPool(db)
+    cache = ResultCache()
+    results = []
+    for name, sql in SCANS.items():
+        timings = []
+        for attempt in (sql, respelled(sql)):
+            start = time.perf_counter()
+            version = pool.load_version()
+            if cache.get(attempt, version) is None:
+                with pool.cursor() as cur:
+                    rows = cur.execute(attempt).fetchall()
+                cache.put(attempt, version, repr(rows))
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append((name, *timings))
+    return results, cache.stats()
+
+
+# What the agent writes when it forgets a LIMIT
+WIDE = {
+    "all_sixes": "SELECT * FROM ball_by_ball WHERE six = 1",
+    "all_sixes_ordered": "SELECT * FROM ball_by_ball WHERE six = 1 ORDER BY date_start DESC",
+    "test_balls": "SELECT match_id, innings, over, striker_id, runs_batsman FROM ball_by_ball WHERE match_type = 'Test'",
+}
+
+
+def bench_fetch(db, repeat=3):
+    """(name, fetchall-then-slice ms, FetchBudget ms) per wide query, best of repeat."""
+    pool = DuckDBPool(db)
+    budget = FetchBudget()
+    results = []
+    for name, sql in WIDE.items():
+        timings = []
+        for run in (lambda cur: cur.execute(sql).fetchall()[:budget.max_rows],
+                    lambda cur: budget.fetch(cur, sql)):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with pool.cursor() as cur:
+                    run(cur)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best * 1000)
+        results.append((name, *timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-call latency of connect-per-call vs the connection pool")
+    parser.add_argument("--db", default=os.path.join(REPO_DIR, "cricket.duckdb"))
+    parser.add_argument("--calls", type=int, default=200, help="tool calls per mode")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent callers")
+    args = parser.parse_args()
+
+    print(f"📊 {args.db}: {args.calls} calls over {args.threads} thread(s)")
+    print(f"{'mode':18s} {'median ms':>10s} {'p95 ms':>10s} {'calls/s':>10s} {'errors':>7s}")
+    for name, make in [("connect_per_call", connect_per_call), ("pool", pooled)]:
+        latencies, errors, seconds = bench(make(args.db), args.calls, args.threads)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{name:18s} {statistics.median(latencies):10.2f} {p95:10.2f} {len(latencies) / seconds:10.0f} {len(errors):7d}")
+        if errors:
+            print(f"  ⚠️ e.g. {errors[0].splitlines()[0]}")
+
+    results, stats = bench_cache(args.db)
+    print(f"\n{'cached query':24s} {'cold ms':>10s} {'warm ms':>10s}")
+    for name, cold, warm in results:
+        print(f"{name:24s} {cold:10.2f} {warm:10.3f}")
+    print(f"🗃️ cache: {stats}")
+
+    print(f"\n{'wide query':24s} {'fetchall ms':>12s} {'budget ms':>10s}")
+    for name, whole, budgeted in bench_fetch(args.db):
+        print(f"{name:24s} {whole:12.2f} {budgeted:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
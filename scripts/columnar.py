@@ -0,0 +1,100 @@
+from array import array
+
+
+class StringTable:
+    """Interns strings to small integer codes; code 0 is always the empty string."""
+
+    def __init__(self):
+        self.values = [""]
+        self.codes = {"": 0}
+
+    def intern(self, value):
+        try:
+            return self.codes[value]
+        except KeyError:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+    def decode(self, codes):
+        return map(self.values.__getitem__, codes)
+
+
+class BallColumns:
+    """Column-oriented buffer for one match's deliveries.
+
+    Numbers live in typed arrays and names in a per-match StringTable, so a
+    delivery costs a few bytes per column instead of a 15-key dict. It
+    pickles compactly for the parser pool and yields rows in BALL_FIELDS
+    order for the CSV writer without building per-row dicts.
+    """
+
+    INT_COLUMNS = [
+        ("innings", "b"), ("over", "h"), ("ball", "h"),
+        ("runs_batsman", "h"), ("runs_extras", "h"), ("runs_total", "h"),
+        ("six", "b"), ("four", "b"),
+    ]
+    STR_COLUMNS = ["striker", "non_striker", "bowler", "extra_type", "dismissal_kind", "dismissed_player"]
+    FIELDS = [
+        "match_id", "innings", "over", "ball", "striker", "non_striker", "bowler",
+        "runs_batsman", "runs_extras", "runs_total", "extra_type", "dismissal_kind",
+        "dismissed_player", "six", "four"
+    ]
+
+    def __init__(self, match_id):
+        self.match_id = match_id
+        self.strings = StringTable()
+        self.ints = {name: array(code) for name, code in self.INT_COLUMNS}
+        self.codes = {name: array("i") for name in self.STR_COLUMNS}
+        self._bind()
+
+    def _bind(self):
+        # Bound append methods, cached once so append() skips the dict lookups
+        self._intern = self.strings.intern
+        self._appends = tuple(self.ints[name].append for name, _ in self.INT_COLUMNS) + \
+            tuple(self.codes[name].append for name in self.STR_COLUMNS)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_intern"], state["_appends"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
+    def __len__(self):
+        return len(self.ints["innings"])
+
+    def append(self, innings, over, ball, striker, non_striker, bowler, runs_batsman,
+               runs_extras, runs_total, extra_type, dismissal_kind, dismissed_player, six, four):
+        (a_innings, a_over, a_ball, a_runs_batsman, a_runs_extras, a_runs_total, a_six, a_four,
+         a_striker, a_non_striker, a_bowler, a_extra_type, a_dismissal_kind,
+         a_dismissed_player) = self._appends
+        intern = self._intern
+        a_innings(innings)
+        a_over(over)
+        a_ball(ball)
+        a_runs_batsman(runs_batsman)
+        a_runs_extras(runs_extras)
+        a_runs_total(runs_total)
+        a_six(six)
+        a_four(four)
+        a_striker(intern(striker))
+        a_non_striker(intern(non_striker))
+        a_bowler(intern(bowler))
+        a_extra_type(intern(extra_type))
+        a_dismissal_kind(intern(dismissal_kind))
+        a_dismissed_player(intern(dismissed_player))
+
+    def column(self, name):
+        """Whole column as an iterable: the typed array for numbers, decoded strings for names."""
+        if name == "match_id":
+            return [self.match_id] * len(self)
+        if name in self.ints:
+            return self.ints[name]
+        return self.strings.decode(self.codes[name])
+
+    def rows(self):
+        """Rows as tuples in FIELDS order."""
+        return zip(*(self.column(name) for name in self.FIELDS))
@@ -0,0 +1,202 @@
+import os
+import json
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# "msgspec" (schema-aware, only decodes the fields below) or "json" (stdlib).
+# CRICSHEET_DECODER=json forces the stdlib path even when msgspec is installed.
+BACKEND = "msgspec" if msgspec is not None and os.environ.get("CRICSHEET_DECODER") != "json" else "json"
+
+
+def safe_get(d, keys, default=""):
+    for k in keys:
+        if isinstance(d, dict) and k in d:
+            d = d[k]
+        else:
+            return default
+    return d
+
+
+# ---------------------------------------------------------------------------
+# Stdlib path
+# ---------------------------------------------------------------------------
+
+def _info_from_dict(info):
+    teams = info.get("teams", ["", ""])
+    return {
+        "match_type": info.get("match_type", ""),
+        "date_start": info.get("dates", [""])[0],
+        "venue": info.get("venue", ""),
+        "city": info.get("city", ""),
+        "country": safe_get(info, ["country"], ""),
+        "home_team": teams[0] if teams else "",
+        "away_team": teams[1] if len(teams) > 1 else "",
+        "toss_winner": safe_get(info, ["toss", "winner"], ""),
+        "toss_decision": safe_get(info, ["toss", "decision"], ""),
+        "player_of_match": ",".join(info.get("player_of_match", [])),
+        "series_name": safe_get(info, ["event", "name"], ""),
+        "result": safe_get(info, ["outcome", "result"], ""),
+        "winner": safe_get(info, ["outcome", "winner"], ""),
+        "players": info.get("players", {}),
+        "registry": safe_get(info, ["registry", "people"], {}),
+    }
+
+
+def _deliveries_from_dict(data):
+    for innings_index, innings in enumerate(data.get("innings", []), start=1):
+        for over_data in innings.get("overs", []):
+            over = over_data.get("over", 0)
+            for ball, d in enumerate(over_data.get("deliveries", []), start=1):
+                extras_type = ",".join(d["extras"].keys()) if "extras" in d else ""
+                dismissal_kind = dismissed_player = ""
+                wickets = d.get("wickets", [])
+                wicket = bool(wickets)
+                if wicket:
+                    dismissal_kind = wickets[0].get("kind", "")
+                    dismissed_player = wickets[0].get("player_out", "")
+                yield (
+                    innings_index, over, ball,
+                    d.get("batter", ""), d.get("bowler", ""), d.get("non_striker", ""),
+                    safe_get(d, ["runs", "batter"], 0),
+                    safe_get(d, ["runs", "extras"], 0),
+                    safe_get(d, ["runs", "total"], 0),
+                    extras_type, dismissal_kind, dismissed_player, wicket,
+                )
+
+
+def _decode_json(raw):
+    data = json.loads(raw)
+    info = _info_from_dict(data.get("info", {}))
+    info["innings_teams"] = [innings.get("team", "") for innings in data.get("innings", [])]
+    return info, list(_deliveries_from_dict(data))
+
+
+# ---------------------------------------------------------------------------
+# msgspec path: only the fields the parser reads are declared, everything
+# else in the file (meta, officials, powerplays...) is skipped
+# without being materialized.
+# ---------------------------------------------------------------------------
+
+if msgspec is not None:
+    class Runs(msgspec.Struct, frozen=True):
+        batter: int = 0
+        extras: int = 0
+        total: int = 0
+
+    class Wicket(msgspec.Struct, frozen=True):
+        kind: str = ""
+        player_out: str = ""
+
+    class Delivery(msgspec.Struct):
+        batter: str = ""
+        bowler: str = ""
+        non_striker: str = ""
+        runs: Runs = Runs()
+        extras: dict = {}
+        wickets: list[Wicket] = []
+
+    class Over(msgspec.Struct):
+        over: int = 0
+        deliveries: list[Delivery] = []
+
+    class Innings(msgspec.Struct):
+        team: str = ""
+        overs: list[Over] = []
+
+    class Toss(msgspec.Struct, frozen=True):
+        winner: str = ""
+        decision: str = ""
+
+    class Event(msgspec.Struct, frozen=True):
+        name: str = ""
+
+    class Outcome(msgspec.Struct, frozen=True):
+        result: str = ""
+        winner: str = ""
+
+    class Registry(msgspec.Struct, frozen=True):
+        people: dict[str, str] = {}
+
+    class Info(msgspec.Struct, frozen=True):
+        match_type: str = ""
+        dates: list[str] = msgspec.field(default_factory=lambda: [""])
+        venue: str = ""
+        city: str = ""
+        country: str = ""
+        teams: list[str] = msgspec.field(default_factory=lambda: ["", ""])
+        toss: Toss = Toss()
+        player_of_match: list[str] = []
+        event: Event = Event()
+        outcome: Outcome = Outcome()
+        players: dict[str, list[str]] = {}
+        registry: Registry = Registry()
+
+    class Match(msgspec.Struct):
+        info: Info = Info()
+        innings: list[Innings] = []
+
+    _decoder = msgspec.json.Decoder(Match)
+
+
+def _decode_msgspec(raw):
+    match = _decoder.decode(raw)
+    info = match.info
+    teams = info.teams
+    info_row = {
+        "match_type": info.match_type,
+        "date_start": info.dates[0],
+        "venue": info.venue,
+        "city": info.city,
+        "country": info.country,
+        "home_team": teams[0] if teams else "",
+        "away_team": teams[1] if len(teams) > 1 else "",
+        "toss_winner": info.toss.winner,
+        "toss_decision": info.toss.decision,
+        "player_of_match": ",".join(info.player_of_match),
+        "series_name": info.event.name,
+        "result": info.outcome.result,
+        "winner": info.outcome.winner,
+        "players": info.players,
+        "registry": info.registry.people,
+        "innings_teams": [innings.team for innings in match.innings],
+    }
+
+    deliveries = []
+    append = deliveries.append
+    for innings_index, innings in enumerate(match.innings, start=1):
+        for over_data in innings.overs:
+            over = over_data.over
+            for ball, d in enumerate(over_data.deliveries, start=1):
+                runs = d.runs
+                wicket = d.wickets[0] if d.wickets else None
+                append((
+                    innings_index, over, ball,
+                    d.batter, d.bowler, d.non_striker,
+                    runs.batter, runs.extras, runs.total,
+                    ",".join(d.extras) if d.extras else "",
+                    wicket.kind if wicket else "",
+                    wicket.player_out if wicket else "",
+                    wicket is not None,
+                ))
+    return info_row, deliveries
+
+
+def decode_match(raw, backend=None):
+    """Decode one Cricsheet match JSON document (bytes or str).
+
+    Returns ``(info, deliveries)``: info is a dict of the match-level fields
+    the parser writes, plus ``players`` ({team: [names]}), ``registry``
+    ({name: Cricsheet person ID}) and ``innings_teams`` (the batting team
+    of each innings, in order); deliveries a list of tuples
+    ``(innings, over, ball, batter, bowler, non_striker, runs_batter,
+    runs_extras, runs_total, extra_type, dismissal_kind, dismissed_player,
+    has_wicket)``. Cricsheet lists a delivery's dismissals under
+    ``wickets``; the rare second dismissal on one ball is not kept.
+    Both backends return identical values for the same document.
+    """
+    if (backend or BACKEND) == "msgspec":
+        return _decode_msgspec(raw)
+    return _decode_json(raw)
@@ -1,31 +1,248 @@
 import os
+import json
 import requests
 import zipfile
-import io
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import RunReport
 
 # Base CricSheet URLs
-URLS = {
-    "test": "https://cricsheet.org/downloads/tests_json.zip",
-    "odi": "https://cricsheet.org/downloads/odis_json.zip",
-    "t20": "https://cricsheet.org/downloads/t20s_json.zip"
+BASE_URL = "https://cricsheet.org/downloads/"
+ARCHIVES = {
+    "test": "tests_json.zip",
+    "odi": "odis_json.zip",
+    "t20": "t20s_json.zip"
 }
+URLS = {fmt: BASE_URL + name for fmt, name in ARCHIVES.items()}
+# Rolling archive of matches added in the last N days (every format and
+# competition mixed together); Cricsheet publishes 2, 7 and 30 day versions
+RECENT_ARCHIVE = "recently_added_{days}_json.zip"
+# info.match_type of the international matches each full archive holds
+MATCH_TYPE_FORMATS = {"Test": "test", "ODI": "odi", "T20": "t20"}
 
 DATA_DIR = "data/cricsheet"
+NEW_MATCHES_FILE = os.path.join(DATA_DIR, "new_matches.txt")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# What --update runs on the new files. The parser appends them to output/raw
+# and the manifest; the next two bring output/ up to date with both, so
+# setup_duckdb.py --incremental never sees a manifest entry without its rows.
+UPDATE_STAGES = [
+    ("parse", [os.path.join(SCRIPTS_DIR, "parse_cricsheet.py"), "--incremental", "--files-from", NEW_MATCHES_FILE]),
+    ("extract_metadata", [os.path.join(SCRIPTS_DIR, "extract_metadata.py")]),
+    ("merge_with_metadata", [os.path.join(SCRIPTS_DIR, "merge_with_metadata.py")]),
+]
+CHUNK_SIZE = 1 << 16  # an interrupted download keeps all but the last chunk
+TIMEOUT = 60
 
-def download_and_extract(format_type):
-    url = URLS[format_type]
+def load_validators(meta_file):
+    if not os.path.exists(meta_file):
+        return {}
+    with open(meta_file) as f:
+        return json.load(f)
+
+def save_validators(meta_file, response, complete):
+    with open(meta_file, "w") as f:
+        json.dump({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "complete": complete,
+        }, f, indent=2)
+
+def fetch_archive(url, zip_path, session=None, report=None):
+    """Download url to zip_path, streaming to disk in chunks.
+
+    Validators (ETag / Last-Modified) are kept in ``<zip_path>.meta.json``:
+    - a complete archive is re-requested conditionally, and a 304 skips it;
+    - an interrupted download continues from ``<zip_path>.part`` with a
+      Range request; If-Range makes the server send the whole file instead
+      if it changed in the meantime.
+
+    Returns True if a new archive was written, False if it was unchanged.
+    """
+    session = session or requests
+    part_path = zip_path + ".part"
+    meta_file = zip_path + ".meta.json"
+    validators = load_validators(meta_file)
+    validator = validators.get("etag") or validators.get("last_modified")
+
+    headers = {}
+    offset = 0
+    if os.path.exists(part_path) and validator and not validators.get("complete"):
+        offset = os.path.getsize(part_path)
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    elif os.path.exists(zip_path) and validators.get("complete"):
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+        if r.status_code == 416:
+            # Stale or oversized partial file; start over
+            os.remove(part_path)
+            return fetch_archive(url, zip_path, session=session, report=report)
+        if r.status_code == 304:
+            print(f"⏭️ Unchanged: {url}")
+            if report:
+                report.count("archives_unchanged")
+            return False
+        r.raise_for_status()
+
+        if r.status_code == 206:
+            print(f"⏯️ Resuming {url} at byte {offset}")
+            mode = "ab"
+        else:
+            offset = 0
+            mode = "wb"
+
+        # Record validators before streaming so an interrupted download can resume
+        save_validators(meta_file, r, complete=False)
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                if report:
+                    report.count("bytes_downloaded", len(chunk))
+
+    os.replace(part_path, zip_path)
+    save_validators(meta_file, r, complete=True)
+    if report:
+        report.count("archives_downloaded")
+    return True
+
+def download_and_extract(format_type, extract=True, report=None, session=None, base_url=BASE_URL, force=False):
+    url = base_url + ARCHIVES[format_type]
+    os.makedirs(DATA_DIR, exist_ok=True)
+    # parse_cricsheet reads matches straight from data/cricsheet/<name>_json.zip
+    zip_path = os.path.join(DATA_DIR, ARCHIVES[format_type])
     save_dir = os.path.join(DATA_DIR, format_type)
-    os.makedirs(save_dir, exist_ok=True)
 
     print(f"Downloading {format_type.upper()} data from {url}...")
-    r = requests.get(url)
-    r.raise_for_status()
+    changed = fetch_archive(url, zip_path, session=session, report=report)
+
+    if not extract or (not changed and os.path.isdir(save_dir) and not force):
+        print(f"Done: {zip_path}")
+        return changed
 
-    print("Extracting files...")
-    with zipfile.ZipFile(io.BytesIO(r.content)) as z:
+    print(f"Extracting files from {zip_path}...")
+    os.makedirs(save_dir, exist_ok=True)
+    with zipfile.ZipFile(zip_path) as z:
         z.extractall(save_dir)
+        if report:
+            report.count("files_extracted", len(z.namelist()))
     print(f"Done: {save_dir}")
+    return changed
+
+def known_match_ids():
+    """Cricsheet IDs (file stems) already in the local store, extracted or zipped."""
+    known = set()
+    for fmt, name in ARCHIVES.items():
+        save_dir = os.path.join(DATA_DIR, fmt)
+        if os.path.isdir(save_dir):
+            known.update(os.path.splitext(f)[0] for f in os.listdir(save_dir) if f.endswith(".json"))
+        zip_path = os.path.join(DATA_DIR, name)
+        if os.path.exists(zip_path):
+            with zipfile.ZipFile(zip_path) as z:
+                known.update(os.path.splitext(os.path.basename(m))[0] for m in z.namelist() if m.endswith(".json"))
+    return known
+
+def merge_recent(zip_path, report=None):
+    """Copy matches we don't have yet from a recently-added archive into the format directories.
+
+    Matches are deduplicated by Cricsheet ID against everything already on
+    disk. Only the international Test, ODI and T20 matches the full
+    archives contain are kept. Returns the paths of the new files.
+    """
+    known = known_match_ids()
+    new_files = []
+    with zipfile.ZipFile(zip_path) as z:
+        for member in sorted(z.namelist()):
+            if not member.endswith(".json"):
+                continue
+            match_key = os.path.splitext(os.path.basename(member))[0]
+            if match_key in known:
+                if report:
+                    report.count("matches_already_present")
+                continue
+
+            raw = z.read(member)
+            info = json.loads(raw).get("info", {})
+            fmt = MATCH_TYPE_FORMATS.get(info.get("match_type"))
+            if fmt is None or info.get("team_type", "international") != "international":
+                if report:
+                    report.count("matches_out_of_scope")
+                continue
+
+            save_dir = os.path.join(DATA_DIR, fmt)
+            os.makedirs(save_dir, exist_ok=True)
+            file_path = os.path.join(save_dir, os.path.basename(member))
+            with open(file_path + ".tmp", "wb") as f:
+                f.write(raw)
+            os.replace(file_path + ".tmp", file_path)
+            known.add(match_key)
+            new_files.append(file_path)
+            if report:
+                report.count("matches_added")
+    return new_files
+
+def update(days=7, report=None, session=None, base_url=BASE_URL):
+    """Fetch the recently-added archive and merge its new matches into the local store.
+
+    The new file paths are written to NEW_MATCHES_FILE for
+    ``parse_cricsheet.py --incremental --files-from``.
+    """
+    name = RECENT_ARCHIVE.format(days=days)
+    url = base_url + name
+    os.makedirs(DATA_DIR, exist_ok=True)
+    zip_path = os.path.join(DATA_DIR, name)
+
+    print(f"Downloading matches added in the last {days} days from {url}...")
+    fetch_archive(url, zip_path, session=session, report=report)
+    new_files = merge_recent(zip_path, report)
+
+    with open(NEW_MATCHES_FILE, "w", encoding="utf-8") as f:
+        f.writelines(os.path.abspath(path) + "\n" for path in new_files)
+    print(f"✅ {len(new_files)} new matches merged, listed in {NEW_MATCHES_FILE}")
+    return new_files
 
 if __name__ == "__main__":
-    for fmt in URLS:
-        download_and_extract(fmt)
+    parser = argparse.ArgumentParser(description="Download Cricsheet JSON archives")
+    parser.add_argument("--no-extract", action="store_true",
+                        help="keep the zip archives instead of extracting every match file")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="where the *_json.zip archives live (e.g. a local mirror or test server)")
+    parser.add_argument("--force-extract", action="store_true",
+                        help="extract even if the archive is unchanged")
+    parser.add_argument("--update", action="store_true",
+                        help="only fetch the recently-added archive, parse the matches that are new and "
+                             "refresh the outputs for setup_duckdb.py --incremental")
+    parser.add_argument("--days", type=int, choices=[2, 7, 30], default=7,
+                        help="with --update, which recently-added archive to use (default: 7)")
+    parser.add_argument("--no-parse", action="store_true",
+                        help="with --update, merge the new matches but don't run the pipeline on them")
+    args = parser.parse_args()
+
+    report = RunReport("download_cricsheet", DATA_DIR)
+
+    if args.update:
+        with report.stage("update"), requests.Session() as session:
+            new_files = update(args.days, report=report, session=session, base_url=args.base_url)
+        if new_files and not args.no_parse:
+            for stage, command in UPDATE_STAGES:
+                with report.stage(stage):
+                    subprocess.run([sys.executable, *command], check=True)
+            print("➡️ Load them with: python db/setup_duckdb.py --incremental")
+        report.write()
+        sys.exit(0)
+
+    def run(fmt):
+        with report.stage(fmt), requests.Session() as session:
+            return download_and_extract(fmt, extract=not args.no_extract, report=report, session=session,
+                                        base_url=args.base_url, force=args.force_extract)
+
+    # The three archives are independent; fetch them concurrently
+    with ThreadPoolExecutor(max_workers=len(ARCHIVES)) as executor:
+        list(executor.map(run, ARCHIVES))
+    report.write()
@@ -1,77 +1,275 @@
 import pandas as pd
 import os
-import hashlib
+import argparse
+from parquet_export import export_parquet
+from instrumentation import RunReport
+from surrogate_keys import KeyDictionary
+
+parser = argparse.ArgumentParser(description="Assign player and team IDs to the parsed CSVs")
+parser.add_argument("--parquet", action="store_true",
+                    help="also write typed Parquet copies partitioned by match_type and year")
+parser.add_argument("--engine", choices=["chunked", "memory"], default="chunked",
+                    help="chunked streams each CSV in bounded chunks (default); memory loads whole files")
+parser.add_argument("--chunk-rows", type=int, default=250_000,
+                    help="rows per chunk for the chunked engine; bounds peak memory (default: 250000)")
+args = parser.parse_args()
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_DIR = os.path.join(BASE_DIR, "..", "output")
+OUTPUT_DIR = os.path.join(os.environ.get("CRICKET_BASE_DIR") or os.path.join(BASE_DIR, ".."), "output")
+
+# parse_cricsheet's CSVs (with names) are read from output/raw and never
+# modified, so the parser can keep appending to them; the ID-mapped copies
+# go to output/ under the same names.
+RAW_DIR = os.path.join(OUTPUT_DIR, "raw")
+RAW_MATCHES_FILE = os.path.join(RAW_DIR, "matches_metadata.csv")
+RAW_PLAYER_INNINGS_FILE = os.path.join(RAW_DIR, "player_innings.csv")
+RAW_BALL_BY_BALL_FILE = os.path.join(RAW_DIR, "ball_by_ball.csv")
+RAW_MATCH_INNINGS_FILE = os.path.join(RAW_DIR, "match_innings.csv")
+MATCH_PLAYERS_FILE = os.path.join(RAW_DIR, "match_players.csv")
 
 MATCHES_FILE = os.path.join(OUTPUT_DIR, "matches_metadata.csv")
 PLAYER_INNINGS_FILE = os.path.join(OUTPUT_DIR, "player_innings.csv")
 BALL_BY_BALL_FILE = os.path.join(OUTPUT_DIR, "ball_by_ball.csv")
+MATCH_INNINGS_FILE = os.path.join(OUTPUT_DIR, "match_innings.csv")
 
 PLAYERS_FILE = os.path.join(OUTPUT_DIR, "players.csv")
 TEAMS_FILE = os.path.join(OUTPUT_DIR, "teams.csv")
 
-# Utility to create stable IDs
-def generate_id(name):
-    """Generate a short stable hash ID for a given string"""
-    return hashlib.md5(name.encode("utf-8")).hexdigest()[:8]
-
-# 1️⃣ Load data
-matches_df = pd.read_csv(MATCHES_FILE)
-innings_df = pd.read_csv(PLAYER_INNINGS_FILE)
-balls_df = pd.read_csv(BALL_BY_BALL_FILE)
-
-# 2️⃣ Extract teams
-teams = sorted(set(matches_df["home_team"]).union(set(matches_df["away_team"])))
-teams_df = pd.DataFrame({
-    "team_id": [generate_id(t) for t in teams],
-    "team_name": teams,
-    "country": teams  # For international cricket, same as name
-})
-teams_df.to_csv(TEAMS_FILE, index=False)
-print(f"✅ Saved teams.csv with {len(teams_df)} teams")
-
-# 3️⃣ Extract players from both innings & balls data
-players = set(innings_df["player"].dropna())
-players.update(balls_df["striker"].dropna())
-players.update(balls_df["bowler"].dropna())
-players.update(balls_df["non_striker"].dropna())
-
-players_df = pd.DataFrame({
-    "player_id": [generate_id(p) for p in players],
-    "player_name": list(players),
-    "batting_hand": [None] * len(players),
-    "bowling_style": [None] * len(players),
-    "country": [None] * len(players)
-})
-players_df.to_csv(PLAYERS_FILE, index=False)
-print(f"✅ Saved players.csv with {len(players_df)} players")
-
-# 4️⃣ Map names to IDs in existing files
-player_map = dict(zip(players_df["player_name"], players_df["player_id"]))
-team_map = dict(zip(teams_df["team_name"], teams_df["team_id"]))
-
-# Update player_innings.csv
-innings_df["player_id"] = innings_df["player"].map(player_map)
-innings_df.drop(columns=["player"], inplace=True)
-innings_df.to_csv(PLAYER_INNINGS_FILE, index=False)
-print("✅ Updated player_innings.csv with player_id")
-
-# Update ball_by_ball.csv
-balls_df["striker_id"] = balls_df["striker"].map(player_map)
-balls_df["bowler_id"] = balls_df["bowler"].map(player_map)
-balls_df["non_striker_id"] = balls_df["non_striker"].map(player_map)
-balls_df.drop(columns=["striker", "bowler", "non_striker"], inplace=True)
-balls_df.to_csv(BALL_BY_BALL_FILE, index=False)
-print("✅ Updated ball_by_ball.csv with player_ids")
-
-# Update matches_metadata.csv
-matches_df["home_team_id"] = matches_df["home_team"].map(team_map)
-matches_df["away_team_id"] = matches_df["away_team"].map(team_map)
-matches_df.drop(columns=["home_team", "away_team"], inplace=True)
-matches_df.to_csv(MATCHES_FILE, index=False)
-print("✅ Updated matches_metadata.csv with team_ids")
+report = RunReport("extract_metadata", OUTPUT_DIR)
+
+# players.csv and teams.csv double as the persistent integer ID
+# dictionaries: reruns keep existing IDs and append new entries. Players are
+# keyed by their Cricsheet person ID, so two players sharing a display name
+# get separate IDs; teams by name.
+PLAYER_COLUMNS = ["player_id", "player_name", "batting_hand", "bowling_style", "country", "cricsheet_id"]
+TEAM_COLUMNS = ["team_id", "team_name", "country"]
+
+def map_ids(frame, column, mapping):
+    """Integer IDs for the names in frame[column], as a nullable Int64 column.
+
+    mapping is either {name: id} or, for players, a Series indexed by
+    (match_id, name), since a display name is only unique within a match.
+    Missing names come out blank rather than turning the column into floats.
+    """
+    if isinstance(mapping, pd.Series):
+        keys = pd.MultiIndex.from_arrays([frame["match_id"], frame[column]])
+        return pd.Series(mapping.reindex(keys).to_numpy(), index=frame.index).astype("Int64")
+    return frame[column].map(mapping).astype("Int64")
+
+# Chunked engine: two streaming passes per file, so memory is bounded by
+# --chunk-rows plus the name -> ID maps, never by the size of the CSVs.
+#
+# pandas infers each column's dtype from whatever it has read, so a column can
+# come out int in one chunk and float (or str) in the next. The first pass
+# records every chunk's dtypes and merges them the way a whole-file read
+# would; the second pass reads with those dtypes, so numbers are formatted
+# exactly as the memory engine writes them.
+
+def column_kind(dtype):
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    return "str"
+
+def merge_kinds(a, b):
+    if a == b:
+        return a
+    if "str" in (a, b) or "bool" in (a, b):
+        return "str"
+    return "float"  # int + float, or int + an all-empty chunk
+
+READ_DTYPES = {"bool": "bool", "int": "int64", "float": "float64", "str": str}
+
+def scan_csv(path, name_columns):
+    """First pass: merged column kinds and the set of values in name_columns."""
+    kinds = {}
+    names = set()
+    for chunk in pd.read_csv(path, chunksize=args.chunk_rows):
+        for column, dtype in chunk.dtypes.items():
+            kind = column_kind(dtype)
+            kinds[column] = merge_kinds(kinds[column], kind) if column in kinds else kind
+        for column in name_columns:
+            names.update(chunk[column].dropna())
+    return kinds, names
+
+def rewrite_csv(src_path, path, kinds, id_columns):
+    """Second pass: copy src_path to path with <name>_id columns instead of the name columns.
+
+    id_columns is a list of (name column, id column, mapping), applied in order.
+    path is written to a temp file and swapped in at the end.
+    """
+    tmp_path = path + ".tmp"
+    dtypes = {column: READ_DTYPES[kind] for column, kind in kinds.items()}
+    rows = 0
+    header = True
+    for chunk in pd.read_csv(src_path, chunksize=args.chunk_rows, dtype=dtypes):
+        for name_column, id_column, mapping in id_columns:
+            chunk[id_column] = map_ids(chunk, name_column, mapping)
+        chunk.drop(columns=[name_column for name_column, _, _ in id_columns], inplace=True)
+        chunk.to_csv(tmp_path, index=False, header=header, mode="w" if header else "a")
+        header = False
+        rows += len(chunk)
+    if header:
+        # No data rows: still write the new header
+        columns = [c for c in kinds if c not in {n for n, _, _ in id_columns}] + [i for _, i, _ in id_columns]
+        pd.DataFrame(columns=columns).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return rows
+
+def save_teams(teams):
+    """Assign integer IDs to any new teams; returns {team_name: team_id}."""
+    dictionary = KeyDictionary(TEAMS_FILE, "team_id", "team_name", TEAM_COLUMNS)
+    # For international cricket, country is the same as the name
+    added = dictionary.assign((t for t in teams if pd.notna(t)), lambda name: {"country": name})
+    dictionary.save()
+    report.count("teams", len(dictionary))
+    print(f"✅ Saved teams.csv with {len(dictionary)} teams ({added} new)")
+    return dictionary.ids
+
+def save_players():
+    """Assign integer IDs to any new players from match_players.csv.
+
+    match_players.csv is the parser's per-match merge of info.players and
+    info.registry.people, a few dozen rows per match, so players are found
+    without scanning the ball table. Returns a (match_id, player) -> player_id
+    Series for map_ids.
+    """
+    if not os.path.exists(MATCH_PLAYERS_FILE):
+        raise SystemExit(f"❌ {MATCH_PLAYERS_FILE} not found, re-run parse_cricsheet.py")
+    match_players = pd.read_csv(MATCH_PLAYERS_FILE, dtype=str).dropna(subset=["player"])
+    # The rare player without a registry entry is keyed by "name:<player>"
+    # instead, and that key is what players.csv holds in cricsheet_id. The
+    # prefix keeps it apart from real registry IDs. If the registry later
+    # lists that player, the ID key is new and gets its own player_id; the
+    # old name: row stays, so IDs already loaded never change meaning.
+    keys = match_players["cricsheet_id"].fillna("name:" + match_players["player"])
+    first_seen = match_players.assign(key=keys).drop_duplicates("key").set_index("key")
+
+    dictionary = KeyDictionary(PLAYERS_FILE, "player_id", "cricsheet_id", PLAYER_COLUMNS)
+    # For international cricket, country is the team they played for
+    added = dictionary.assign(first_seen.index, lambda key: {
+        "player_name": first_seen.at[key, "player"],
+        "country": first_seen.at[key, "team"] if pd.notna(first_seen.at[key, "team"]) else "",
+    })
+    dictionary.save()
+    report.count("players", len(dictionary))
+    print(f"✅ Saved players.csv with {len(dictionary)} players ({added} new)")
+
+    lookup = pd.Series(keys.map(dictionary.ids).to_numpy(),
+                       index=pd.MultiIndex.from_arrays([match_players["match_id"], match_players["player"]]))
+    return lookup[~lookup.index.duplicated()]
+
+def run_chunked():
+    # 1️⃣ Scan data
+    with report.stage("load"):
+        matches_kinds, teams = scan_csv(RAW_MATCHES_FILE, ["home_team", "away_team"])
+        innings_kinds, _ = scan_csv(RAW_PLAYER_INNINGS_FILE, [])
+        balls_kinds, _ = scan_csv(RAW_BALL_BY_BALL_FILE, [])
+        match_innings_kinds, batting_teams = scan_csv(RAW_MATCH_INNINGS_FILE, ["batting_team"])
+
+    # 2️⃣ Extract teams
+    with report.stage("teams"):
+        team_map = save_teams(teams | batting_teams)
+
+    # 3️⃣ Extract players from the per-match registries
+    with report.stage("players"):
+        player_map = save_players()
+
+    # 4️⃣ Write ID-mapped copies of the raw files
+    with report.stage("rewrite"):
+        innings_rows = rewrite_csv(RAW_PLAYER_INNINGS_FILE, PLAYER_INNINGS_FILE, innings_kinds, [("player", "player_id", player_map)])
+        print("✅ Updated player_innings.csv with player_id")
+
+        balls_rows = rewrite_csv(RAW_BALL_BY_BALL_FILE, BALL_BY_BALL_FILE, balls_kinds, [
+            ("striker", "striker_id", player_map),
+            ("bowler", "bowler_id", player_map),
+            ("non_striker", "non_striker_id", player_map),
+        ])
+        print("✅ Updated ball_by_ball.csv with player_ids")
+
+        matches_rows = rewrite_csv(RAW_MATCHES_FILE, MATCHES_FILE, matches_kinds, [
+            ("home_team", "home_team_id", team_map),
+            ("away_team", "away_team_id", team_map),
+        ])
+        print("✅ Updated matches_metadata.csv with team_ids")
+
+        match_innings_rows = rewrite_csv(RAW_MATCH_INNINGS_FILE, MATCH_INNINGS_FILE, match_innings_kinds, [
+            ("batting_team", "batting_team_id", team_map),
+        ])
+        print("✅ Updated match_innings.csv with team_ids")
+
+        report.count("matches", matches_rows)
+        report.count("balls", balls_rows)
+        report.count("rows_written", report.counters["teams"] + report.counters["players"] + innings_rows + balls_rows
+                     + matches_rows + match_innings_rows)
+
+def run_in_memory():
+    # 1️⃣ Load data
+    with report.stage("load"):
+        matches_df = pd.read_csv(RAW_MATCHES_FILE)
+        innings_df = pd.read_csv(RAW_PLAYER_INNINGS_FILE)
+        balls_df = pd.read_csv(RAW_BALL_BY_BALL_FILE)
+        match_innings_df = pd.read_csv(RAW_MATCH_INNINGS_FILE)
+        report.count("matches", len(matches_df))
+        report.count("balls", len(balls_df))
+
+    # 2️⃣ Extract teams
+    with report.stage("teams"):
+        team_map = save_teams(set(matches_df["home_team"]).union(set(matches_df["away_team"]),
+                                                                 set(match_innings_df["batting_team"])))
+
+    # 3️⃣ Extract players from the per-match registries
+    with report.stage("players"):
+        player_map = save_players()
+
+    # 4️⃣ Write ID-mapped copies of the raw files
+    with report.stage("rewrite"):
+        # Update player_innings.csv
+        innings_df["player_id"] = map_ids(innings_df, "player", player_map)
+        innings_df.drop(columns=["player"], inplace=True)
+        innings_df.to_csv(PLAYER_INNINGS_FILE, index=False)
+        print("✅ Updated player_innings.csv with player_id")
+
+        # Update ball_by_ball.csv
+        balls_df["striker_id"] = map_ids(balls_df, "striker", player_map)
+        balls_df["bowler_id"] = map_ids(balls_df, "bowler", player_map)
+        balls_df["non_striker_id"] = map_ids(balls_df, "non_striker", player_map)
+        balls_df.drop(columns=["striker", "bowler", "non_striker"], inplace=True)
+        balls_df.to_csv(BALL_BY_BALL_FILE, index=False)
+        print("✅ Updated ball_by_ball.csv with player_ids")
+
+        # Update matches_metadata.csv
+        matches_df["home_team_id"] = map_ids(matches_df, "home_team", team_map)
+        matches_df["away_team_id"] = map_ids(matches_df, "away_team", team_map)
+        matches_df.drop(columns=["home_team", "away_team"], inplace=True)
+        matches_df.to_csv(MATCHES_FILE, index=False)
+        print("✅ Updated matches_metadata.csv with team_ids")
+
+        # Update match_innings.csv
+        match_innings_df["batting_team_id"] = map_ids(match_innings_df, "batting_team", team_map)
+        match_innings_df.drop(columns=["batting_team"], inplace=True)
+        match_innings_df.to_csv(MATCH_INNINGS_FILE, index=False)
+        print("✅ Updated match_innings.csv with team_ids")
+
+        report.count("rows_written", report.counters["teams"] + report.counters["players"] + len(innings_df) + len(balls_df)
+                     + len(matches_df) + len(match_innings_df))
+
+if not os.path.exists(RAW_MATCH_INNINGS_FILE):
+    raise SystemExit(f"❌ {RAW_MATCH_INNINGS_FILE} not found, re-run parse_cricsheet.py")
+
+if args.engine == "chunked":
+    run_chunked()
+else:
+    run_in_memory()
+
+if args.parquet:
+    with report.stage("parquet_export"):
+        for name in ["players", "teams", "matches_metadata", "player_innings", "ball_by_ball", "match_innings"]:
+            export_parquet(OUTPUT_DIR, name)
 
 print("🎯 Metadata extraction complete. All files now have IDs for clean joins.")
+report.write()
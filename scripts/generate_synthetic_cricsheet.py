@@ -0,0 +1,273 @@
+import os
+import json
+import random
+import hashlib
+import zipfile
+import argparse
+from multiprocessing import Pool
+
+# Synthetic Cricsheet-format match generator for benchmarking the ingest
+# pipeline on build machines that can't download the real archives.
+#
+# Matches follow the Cricsheet JSON layout (meta, info incl. registry,
+# innings/overs/deliveries with extras and wickets) and are simulated ball by
+# ball, so over counts, extras, wickets and innings lengths look like real
+# Test, ODI and T20 cricket. Output is deterministic for a given --seed,
+# independent of --workers.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "data", "cricsheet")
+
+TEAMS = {
+    "Australia": ["Melbourne Cricket Ground", "Sydney Cricket Ground", "Adelaide Oval", "The Gabba"],
+    "England": ["Lord's", "The Oval", "Edgbaston", "Old Trafford"],
+    "India": ["Eden Gardens", "Wankhede Stadium", "M Chinnaswamy Stadium", "Feroz Shah Kotla"],
+    "Pakistan": ["Gaddafi Stadium", "National Stadium", "Rawalpindi Cricket Stadium"],
+    "New Zealand": ["Eden Park", "Basin Reserve", "Hagley Oval"],
+    "South Africa": ["Newlands", "Wanderers Stadium", "Kingsmead", "SuperSport Park"],
+    "Sri Lanka": ["R Premadasa Stadium", "Galle International Stadium", "Pallekele International Cricket Stadium"],
+    "West Indies": ["Kensington Oval", "Sabina Park", "Queen's Park Oval"],
+    "Bangladesh": ["Shere Bangla National Stadium", "Zahur Ahmed Chowdhury Stadium"],
+    "Zimbabwe": ["Harare Sports Club", "Queens Sports Club"],
+}
+FIRST_INITIALS = "ABCDEGHJKMNPRSTVW"
+SURNAMES = [
+    "Smith", "Khan", "Sharma", "Williams", "Taylor", "Brown", "Ali", "Patel", "Singh", "Jones",
+    "Ahmed", "Perera", "Silva", "Fernando", "Rahman", "Hossain", "Kumar", "Clarke", "Stokes",
+    "Warner", "Boult", "Southee", "Rabada", "Ngidi", "Holder", "Joseph", "Iqbal", "Shah",
+    "Mendis", "Chandimal", "Rashid", "Malik", "Anderson", "Broad", "Root", "Starc", "Cummins",
+]
+POOL_SIZE = 40
+
+# match_type, weight in the corpus, overs per innings (None = unlimited),
+# innings per match, probability of a wicket on a legal ball
+FORMATS = {
+    "test": ("Test", 0.15, None, 4, 1 / 58),
+    "odi": ("ODI", 0.35, 50, 2, 1 / 34),
+    "t20": ("T20", 0.50, 20, 2, 1 / 20),
+}
+ARCHIVES = {"test": "tests_json.zip", "odi": "odis_json.zip", "t20": "t20s_json.zip"}
+
+RUN_WEIGHTS = {
+    "Test": ([0, 1, 2, 3, 4, 6], [62, 22, 6, 1, 8, 1]),
+    "ODI": ([0, 1, 2, 3, 4, 6], [48, 33, 8, 1, 8, 2]),
+    "T20": ([0, 1, 2, 3, 4, 6], [36, 36, 9, 1, 12, 6]),
+}
+DISMISSALS = (["caught", "bowled", "lbw", "run out", "stumped", "caught and bowled"],
+              [55, 18, 14, 7, 3, 3])
+EXTRAS = (["wides", "noballs", "legbyes", "byes"], [45, 15, 30, 10])
+EXTRA_RATE = {"Test": 0.03, "ODI": 0.05, "T20": 0.06}
+
+
+def person_id(name):
+    return hashlib.md5(name.encode("utf-8")).hexdigest()[:8]
+
+
+def team_pool(team):
+    """Fixed pool of players for a team, so players recur across matches."""
+    rng = random.Random(team)
+    names = set()
+    while len(names) < POOL_SIZE:
+        names.add(f"{rng.choice(FIRST_INITIALS)}{rng.choice(FIRST_INITIALS + '  ').strip()} {rng.choice(SURNAMES)}")
+    return sorted(names)
+
+
+POOLS = {team: team_pool(team) for team in TEAMS}
+
+
+def simulate_innings(rng, match_type, batting, bowling, max_overs, wicket_rate, target=None):
+    """Ball-by-ball simulation of one innings in Cricsheet 'overs' layout.
+
+    Ends on ten wickets, the over limit (random for Tests, standing in for a
+    declaration) or, in a chase, once the total passes target.
+    """
+    values, weights = RUN_WEIGHTS[match_type]
+    bowlers = bowling[-6:]
+    order = list(batting)
+    striker, non_striker, next_in = order[0], order[1], 2
+    wickets = 0
+    total = 0
+    overs = []
+    over_limit = max_overs or rng.randint(40, 160)
+    last_bowler = None
+
+    for over_no in range(over_limit):
+        bowler = rng.choice([b for b in bowlers if b != last_bowler])
+        last_bowler = bowler
+        deliveries = []
+        legal = 0
+        while legal < 6:
+            d = {"batter": striker, "bowler": bowler, "non_striker": non_striker}
+            runs_batter, extras = rng.choices(values, weights)[0], {}
+            if rng.random() < EXTRA_RATE[match_type]:
+                kind = rng.choices(*EXTRAS)[0]
+                if kind in ("wides", "noballs"):
+                    extras[kind] = 1
+                    if kind == "wides":
+                        runs_batter = 0
+                else:
+                    extras[kind] = rng.choice([1, 1, 1, 2, 4])
+                    runs_batter = 0
+            runs_extras = sum(extras.values())
+            d["runs"] = {"batter": runs_batter, "extras": runs_extras, "total": runs_batter + runs_extras}
+            total += runs_batter + runs_extras
+            if extras:
+                d["extras"] = extras
+            if "wides" not in extras and "noballs" not in extras:
+                legal += 1
+
+            out = rng.random() < wicket_rate and "wides" not in extras
+            if out:
+                kind = rng.choices(*DISMISSALS)[0]
+                player_out = non_striker if kind == "run out" and rng.random() < 0.3 else striker
+                wicket = {"player_out": player_out, "kind": kind}
+                if kind in ("caught", "run out", "stumped"):
+                    wicket["fielders"] = [{"name": rng.choice(bowling)}]
+                d["wickets"] = [wicket]
+            deliveries.append(d)
+
+            if target is not None and total > target:
+                break
+            if out:
+                wickets += 1
+                if wickets == 10:
+                    break
+                if player_out == striker:
+                    striker = order[next_in]
+                else:
+                    non_striker = order[next_in]
+                next_in += 1
+            elif runs_batter % 2 == 1:
+                striker, non_striker = non_striker, striker
+
+        overs.append({"over": over_no, "deliveries": deliveries})
+        if wickets == 10 or (target is not None and total > target):
+            break
+        striker, non_striker = non_striker, striker
+
+    return overs
+
+
+def generate_match(args):
+    """Build one match document; args = (seed, index, fmt)."""
+    seed, index, fmt = args
+    rng = random.Random(seed * 1_000_003 + index)
+    match_type, _, max_overs, innings_count, wicket_rate = FORMATS[fmt]
+
+    home, away = rng.sample(sorted(TEAMS), 2)
+    players = {team: rng.sample(POOLS[team], 11) for team in (home, away)}
+    venue = rng.choice(TEAMS[home])
+    year = rng.randint(2001, 2024)
+    start = f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 24):02d}"
+    days = 5 if match_type == "Test" else 1
+
+    toss_winner = rng.choice([home, away])
+    decision = rng.choice(["bat", "field"])
+    bat_first = toss_winner if decision == "bat" else (away if toss_winner == home else home)
+    bowl_first = away if bat_first == home else home
+
+    innings = []
+    totals = {home: 0, away: 0}
+    for i in range(innings_count):
+        batting, bowling = (bat_first, bowl_first) if i % 2 == 0 else (bowl_first, bat_first)
+        target = totals[bowling] - totals[batting] if i == innings_count - 1 else None
+        overs = simulate_innings(rng, match_type, players[batting], players[bowling], max_overs, wicket_rate, target)
+        totals[batting] += sum(d["runs"]["total"] for o in overs for d in o["deliveries"])
+        innings.append({"team": batting, "overs": overs})
+
+    chasing = innings[-1]["team"]
+    if totals[home] == totals[away]:
+        outcome = {"result": "tie"} if match_type != "Test" else {"result": "draw"}
+    elif match_type == "Test" and rng.random() < 0.3:
+        outcome = {"result": "draw"}
+    elif totals[chasing] > totals[home if chasing == away else away]:
+        fallen = sum(len(d.get("wickets", [])) for o in innings[-1]["overs"] for d in o["deliveries"])
+        outcome = {"winner": chasing, "by": {"wickets": 10 - fallen}}
+    else:
+        winner = home if totals[home] > totals[away] else away
+        outcome = {"winner": winner, "by": {"runs": abs(totals[home] - totals[away])}}
+
+    everyone = players[home] + players[away]
+    info = {
+        "balls_per_over": 6,
+        "city": venue.split()[0],
+        "dates": [f"{start[:8]}{int(start[8:]) + d:02d}" for d in range(days)],
+        "event": {"name": f"{home} tour of {away}" if rng.random() < 0.5 else f"{away} tour of {home}"},
+        "gender": "male",
+        "match_type": match_type,
+        "officials": {"umpires": ["Umpire One", "Umpire Two"]},
+        "outcome": outcome,
+        "overs": max_overs,
+        "player_of_match": [rng.choice(everyone)],
+        "players": players,
+        "registry": {"people": {name: person_id(name) for name in everyone}},
+        "season": str(year),
+        "team_type": "international",
+        "teams": [home, away],
+        "toss": {"decision": decision, "winner": toss_winner},
+        "venue": venue,
+    }
+    if max_overs is None:
+        del info["overs"]
+
+    doc = {"meta": {"data_version": "1.1.0", "created": start, "revision": 1}, "info": info, "innings": innings}
+    return json.dumps(doc).encode("utf-8")
+
+
+def plan(matches, start_id):
+    """(file name, format) per match, formats interleaved by their weights."""
+    weights = [FORMATS[fmt][1] for fmt in FORMATS]
+    rng = random.Random(matches)
+    formats = rng.choices(list(FORMATS), weights, k=matches)
+    return [(f"{start_id + i}.json", fmt) for i, fmt in enumerate(formats)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Cricsheet JSON corpus")
+    parser.add_argument("--matches", type=int, default=1000, help="number of matches (default: 1000)")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT,
+                        help="corpus root; matches go to <format>/ subdirectories or archives")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-id", type=int, default=1000001, help="Cricsheet ID of the first match")
+    parser.add_argument("--zip", action="store_true",
+                        help="write <format>s_json.zip archives instead of individual files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    matches = plan(args.matches, args.start_id)
+    jobs = [(args.seed, i, fmt) for i, (_, fmt) in enumerate(matches)]
+
+    archives = {}
+    if args.zip:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for fmt, name in ARCHIVES.items():
+            archives[fmt] = zipfile.ZipFile(os.path.join(args.output_dir, name), "w", zipfile.ZIP_DEFLATED)
+    else:
+        for fmt in FORMATS:
+            os.makedirs(os.path.join(args.output_dir, fmt), exist_ok=True)
+
+    pool = Pool(args.workers) if args.workers > 1 else None
+    docs = pool.imap(generate_match, jobs, chunksize=16) if pool else map(generate_match, jobs)
+
+    total_bytes = 0
+    for (file_name, fmt), doc in zip(matches, docs):
+        total_bytes += len(doc)
+        if args.zip:
+            archives[fmt].writestr(file_name, doc)
+        else:
+            with open(os.path.join(args.output_dir, fmt, file_name), "wb") as f:
+                f.write(doc)
+
+    if pool:
+        pool.close()
+        pool.join()
+    for z in archives.values():
+        z.close()
+
+    counts = {fmt: sum(1 for _, f in matches if f == fmt) for fmt in FORMATS}
+    print(f"✅ Generated {args.matches} matches ({total_bytes / 1e6:.1f} MB JSON): {counts}")
+    print(f"📄 Corpus saved in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import heapq
+import resource
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Shared run instrumentation for the pipeline scripts: stage timers,
+# counters, the slowest input files and peak memory per stage, written as a
+# JSON run report next to each script's outputs.
+#
+#   report = RunReport("parse_cricsheet", OUTPUT_DIR)
+#   with report.stage("parse"):
+#       ...
+#       report.count("balls", len(balls))
+#       report.record_file(path, seconds)
+#   report.write()
+
+
+def current_rss_mb():
+    """Resident set size of this process right now (Linux), else the peak so far."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1e6 if sys.platform == "darwin" else 1e3
+    return resource.getrusage(who).ru_maxrss / scale
+
+
+class _RssSampler(threading.Thread):
+    """Samples RSS in the background so each stage gets its own peak."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, current_rss_mb())
+        return self.peak
+
+
+class RunReport:
+    def __init__(self, script, output_dir, slowest=20):
+        self.script = script
+        self.output_dir = output_dir
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.stages = []
+        self.counters = {}
+        self.slowest = slowest
+        self._files = []  # min-heap of (seconds, path)
+        self._lock = threading.Lock()  # stages may run in worker threads
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block and record its peak RSS (and that of any child processes)."""
+        sampler = _RssSampler()
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = {
+                "stage": name,
+                "seconds": round(time.perf_counter() - start, 3),
+                "peak_rss_mb": round(sampler.stop(), 1),
+                "peak_child_rss_mb": round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+            }
+            with self._lock:
+                self.stages.append(stage)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_file(self, path, seconds):
+        """Keep the N slowest input files."""
+        item = (seconds, str(path))
+        with self._lock:
+            if len(self._files) < self.slowest:
+                heapq.heappush(self._files, item)
+            elif item > self._files[0]:
+                heapq.heapreplace(self._files, item)
+
+    def to_dict(self):
+        total = time.perf_counter() - self.started
+        return {
+            "script": self.script,
+            "started_at": self.started_at,
+            "total_seconds": round(total, 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": self.stages,
+            "counters": self.counters,
+            "slowest_files": [
+                {"file": path, "seconds": round(seconds, 4)}
+                for seconds, path in sorted(self._files, reverse=True)
+            ],
+        }
+
+    def write(self):
+        """Write run_report_<script>.json into the output directory and return its path."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"run_report_{self.script}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"🧾 Run report saved: {path}")
+        return path
@@ -1,5 +1,18 @@
 import pandas as pd
 import os
+import argparse
+import duckdb
+from parquet_export import export_parquet, denormalized_ball_by_ball, typed_csv
+from instrumentation import RunReport
+
+parser = argparse.ArgumentParser(description="Join ball-by-ball rows with match metadata")
+parser.add_argument("--parquet", action="store_true",
+                    help="also write a typed Parquet copy partitioned by match_type and year")
+parser.add_argument("--engine", choices=["duckdb", "pandas"], default="duckdb",
+                    help="duckdb streams the join straight to disk with COPY (default); pandas merges in memory")
+parser.add_argument("--memory-limit", default="1GB",
+                    help="DuckDB memory limit for the duckdb engine (default: 1GB)")
+args = parser.parse_args()
 
 # Hardcoded paths
 BASE_DIR = "output"
@@ -7,37 +20,80 @@ BALL_FILE = os.path.join(BASE_DIR, "ball_by_ball.csv")
 META_FILE = os.path.join(BASE_DIR, "matches_metadata.csv")
 OUTPUT_FILE = os.path.join(BASE_DIR, "ultimate_ball_by_ball.csv")
 
-# Load ball-by-ball data
-print("📂 Reading ball-by-ball data...")
-ball_df = pd.read_csv(BALL_FILE)
-
-# Load match metadata
-print("📂 Reading match metadata...")
-meta_df = pd.read_csv(META_FILE)
-
-# Ensure match_id is same type
-ball_df["match_id"] = ball_df["match_id"].astype(str)
-meta_df["match_id"] = meta_df["match_id"].astype(str)
-
-# Merge
-print("🔄 Merging datasets...")
-merged_df = ball_df.merge(meta_df, on="match_id", how="left")
-
-# Add match_format column if not present
-if "match_format" not in merged_df.columns:
-    # Try to infer format from metadata (you can customize this if your metadata has this field)
-    if "format" in meta_df.columns:
-        merged_df["match_format"] = merged_df["format"]
-    else:
-        # Fallback: detect from overs count or match_type field
-        merged_df["match_format"] = merged_df["match_type"] if "match_type" in merged_df.columns else "Unknown"
-
-# Sort by match_date if available
-if "match_date" in merged_df.columns:
-    merged_df["match_date"] = pd.to_datetime(merged_df["match_date"], errors="coerce")
-    merged_df = merged_df.sort_values(by="match_date")
-
-# Save
-merged_df.to_csv(OUTPUT_FILE, index=False)
-print(f"✅ Ultimate dataset saved: {OUTPUT_FILE}")
-print(f"📊 Total rows: {len(merged_df)}")
+report = RunReport("merge_with_metadata", BASE_DIR)
+
+# db/setup_duckdb.py --view exposes this same shape as a view instead, so
+# the file is only needed for consumers that want a flat CSV.
+
+def merge_with_duckdb():
+    """Stream the join to OUTPUT_FILE with a DuckDB COPY.
+
+    Balls are read with declared types and probed against a hash table of
+    the (small) match metadata, so memory stays within --memory-limit no
+    matter how large ball_by_ball.csv is. Row order within the file is not
+    guaranteed to follow ball_by_ball.csv.
+    """
+    con = duckdb.connect()
+    con.execute(f"SET memory_limit = '{args.memory_limit}'")
+    with report.stage("merge"):
+        print("🔄 Merging datasets with DuckDB...")
+        query = denormalized_ball_by_ball(typed_csv(BALL_FILE), typed_csv(META_FILE))
+        rows = con.execute(f"COPY ({query}) TO '{OUTPUT_FILE}' (HEADER, DELIMITER ',')").fetchone()[0]
+        report.count("balls", rows)
+        report.count("rows_written", rows)
+    con.close()
+    print(f"✅ Ultimate dataset saved: {OUTPUT_FILE}")
+    print(f"📊 Total rows: {rows}")
+
+def merge_with_pandas():
+    with report.stage("load"):
+        # Load ball-by-ball data
+        print("📂 Reading ball-by-ball data...")
+        ball_df = pd.read_csv(BALL_FILE)
+
+        # Load match metadata
+        print("📂 Reading match metadata...")
+        meta_df = pd.read_csv(META_FILE)
+        report.count("balls", len(ball_df))
+        report.count("matches", len(meta_df))
+
+    with report.stage("merge"):
+        # Ensure match_id is same type
+        ball_df["match_id"] = ball_df["match_id"].astype(str)
+        meta_df["match_id"] = meta_df["match_id"].astype(str)
+
+        # Merge
+        print("🔄 Merging datasets...")
+        merged_df = ball_df.merge(meta_df, on="match_id", how="left")
+
+        # Add match_format column if not present
+        if "match_format" not in merged_df.columns:
+            # Try to infer format from metadata (you can customize this if your metadata has this field)
+            if "format" in meta_df.columns:
+                merged_df["match_format"] = merged_df["format"]
+            else:
+                # Fallback: detect from overs count or match_type field
+                merged_df["match_format"] = merged_df["match_type"] if "match_type" in merged_df.columns else "Unknown"
+
+        # Sort by match_date if available
+        if "match_date" in merged_df.columns:
+            merged_df["match_date"] = pd.to_datetime(merged_df["match_date"], errors="coerce")
+            merged_df = merged_df.sort_values(by="match_date")
+
+    with report.stage("write"):
+        # Save
+        merged_df.to_csv(OUTPUT_FILE, index=False)
+        report.count("rows_written", len(merged_df))
+        print(f"✅ Ultimate dataset saved: {OUTPUT_FILE}")
+        print(f"📊 Total rows: {len(merged_df)}")
+
+if args.engine == "duckdb":
+    merge_with_duckdb()
+else:
+    merge_with_pandas()
+
+if args.parquet:
+    with report.stage("parquet_export"):
+        export_parquet(BASE_DIR, "ultimate_ball_by_ball")
+
+report.write()
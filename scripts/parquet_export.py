@@ -0,0 +1,98 @@
+import os
+import csv
+import shutil
+import duckdb
+
+# Explicit Parquet types by column name; anything not listed is a VARCHAR.
+# DuckDB's Parquet writer dictionary-encodes the low-cardinality string
+# columns (players, teams, venues) on its own.
+COLUMN_TYPES = {
+    "date_start": "DATE",
+    "innings": "TINYINT",
+    "over": "SMALLINT",
+    "ball": "SMALLINT",
+    "runs_batsman": "SMALLINT",
+    "runs_extras": "SMALLINT",
+    "runs_total": "SMALLINT",
+    "six": "TINYINT",
+    "four": "TINYINT",
+    "runs": "SMALLINT",
+    "balls": "SMALLINT",
+    "fours": "SMALLINT",
+    "sixes": "SMALLINT",
+    "strike_rate": "DOUBLE",
+    "total_runs": "INTEGER",
+    "highest_individual_score": "SMALLINT",
+    "fifties": "SMALLINT",
+    "hundreds": "SMALLINT",
+    "total_wickets": "SMALLINT",
+    "best_bowler_economy": "DOUBLE",
+    # Dense surrogate keys from extract_metadata
+    "player_id": "INTEGER",
+    "striker_id": "INTEGER",
+    "bowler_id": "INTEGER",
+    "non_striker_id": "INTEGER",
+    "team_id": "INTEGER",
+    "home_team_id": "INTEGER",
+    "away_team_id": "INTEGER",
+    "batting_team_id": "INTEGER",
+}
+
+MATCHES_CSV = "matches_metadata.csv"
+
+
+def typed_csv(csv_path):
+    """read_csv() expression for csv_path using COLUMN_TYPES instead of sniffing."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    columns = ", ".join(f"'{col}': '{COLUMN_TYPES.get(col, 'VARCHAR')}'" for col in header)
+    return f"read_csv('{csv_path}', header=true, auto_detect=false, columns={{{columns}}})"
+
+
+def denormalized_ball_by_ball(balls, matches):
+    """SELECT giving ultimate_ball_by_ball's shape from the narrow ball table and matches.
+
+    Same columns as merge_with_metadata's pandas merge: every ball column,
+    every match column except match_id, then match_format. balls and matches
+    are table names or table expressions such as typed_csv().
+    """
+    return f"""
+        SELECT b.*, m.* EXCLUDE (match_id), m.match_type AS match_format
+        FROM {balls} b
+        LEFT JOIN {matches} m USING (match_id)
+    """
+
+
+def export_parquet(output_dir, name):
+    """Write output_dir/<name>.csv to output_dir/parquet/<name>.
+
+    Tables with a match_id are partitioned by match_type and year
+    (hive-style, ``match_type=Test/year=2015/``) so DuckDB can skip whole
+    partitions for format- and date-filtered queries. Tables without
+    match_type/date_start take them from matches_metadata.csv.
+    """
+    csv_path = os.path.join(output_dir, f"{name}.csv")
+    target = os.path.join(output_dir, "parquet", name)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+
+    con = duckdb.connect()
+    if "match_id" not in header:
+        con.execute(f"COPY (SELECT * FROM {typed_csv(csv_path)}) TO '{target}.parquet' (FORMAT PARQUET)")
+    else:
+        if "match_type" in header and "date_start" in header:
+            source = f"SELECT *, year(date_start) AS year FROM {typed_csv(csv_path)}"
+        else:
+            matches = typed_csv(os.path.join(output_dir, MATCHES_CSV))
+            source = f"""
+                SELECT t.*, m.match_type, year(m.date_start) AS year
+                FROM {typed_csv(csv_path)} t
+                LEFT JOIN (SELECT match_id, match_type, date_start FROM {matches}) m USING (match_id)
+            """
+        con.execute(f"COPY ({source}) TO '{target}' (FORMAT PARQUET, PARTITION_BY (match_type, year))")
+    con.close()
+    print(f"📦 Saved Parquet: {target}")
@@ -1,142 +1,179 @@
 import os
-import json
 import csv
+import argparse
+import zipfile
+import zlib
+import time
+import itertools
+import shutil
 from glob import glob
-from collections import defaultdict
-
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-INPUT_DIRS = [
-    os.path.join(BASE_DIR, "data", "cricsheet", "odi"),
-    os.path.join(BASE_DIR, "data", "cricsheet", "test"),
-    os.path.join(BASE_DIR, "data", "cricsheet", "t20"),
+from multiprocessing import Pool
+from parquet_export import export_parquet
+from columnar import BallColumns
+from cricsheet_decoder import decode_match
+from instrumentation import RunReport
+
+# CRICKET_BASE_DIR points the pipeline at another data/ + output/ tree (used by bench_ingest)
+BASE_DIR = os.environ.get("CRICKET_BASE_DIR") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data", "cricsheet")
+# (extracted directory, downloaded archive) per format, in processing order.
+# Either may be missing; a file in the directory wins over the same match in the zip.
+INPUTS = [
+    (os.path.join(DATA_DIR, "odi"), os.path.join(DATA_DIR, "odis_json.zip")),
+    (os.path.join(DATA_DIR, "test"), os.path.join(DATA_DIR, "tests_json.zip")),
+    (os.path.join(DATA_DIR, "t20"), os.path.join(DATA_DIR, "t20s_json.zip")),
 ]
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-def safe_get(d, keys, default=""):
-    for k in keys:
-        if isinstance(d, dict) and k in d:
-            d = d[k]
-        else:
-            return default
-    return d
+# The parser's own CSVs, with player and team names. extract_metadata reads
+# them and writes the ID-mapped copies to OUTPUT_DIR, so these stay
+# appendable for --incremental runs.
+RAW_DIR = os.path.join(OUTPUT_DIR, "raw")
+os.makedirs(RAW_DIR, exist_ok=True)
+
+# Column order of each output file; rows are streamed to these as matches are parsed
+METADATA_FIELDS = [
+    "match_id", "match_type", "date_start", "venue", "city", "country", "home_team",
+    "away_team", "toss_winner", "toss_decision", "player_of_match", "series_name",
+    "result", "winner", "match_url"
+]
+BALL_FIELDS = BallColumns.FIELDS
+PLAYER_INNINGS_FIELDS = [
+    "match_id", "innings", "player", "runs", "balls", "fours", "sixes", "strike_rate"
+]
+# Everyone who took part in a match, with their Cricsheet person ID from
+# info.registry.people; extract_metadata builds players.csv from this
+MATCH_PLAYERS_FIELDS = ["match_id", "team", "player", "cricsheet_id"]
+# The batting team of each innings, from innings[].team
+MATCH_INNINGS_FIELDS = ["match_id", "innings", "batting_team"]
+SUMMARY_FIELDS = [
+    "match_id", "match_type", "date_start", "venue", "home_team", "away_team", "winner",
+    "total_runs", "highest_individual_score", "fifties", "hundreds", "total_wickets",
+    "best_bowler", "best_bowling_figures", "best_bowler_economy"
+]
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.csv")
+MANIFEST_FIELDS = ["source_file", "size", "mtime_ns", "content_hash", "match_id"]
+OUTPUT_FILES = {
+    "matches_metadata.csv": METADATA_FIELDS,
+    "ball_by_ball.csv": BALL_FIELDS,
+    "player_innings.csv": PLAYER_INNINGS_FIELDS,
+    "match_summary.csv": SUMMARY_FIELDS,
+    "match_players.csv": MATCH_PLAYERS_FIELDS,
+    "match_innings.csv": MATCH_INNINGS_FIELDS,
+}
 
 def parse_match(file_path, match_id):
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    info = data.get("info", {})
-    teams = info.get("teams", ["", ""])
-    metadata = {
-        "match_id": match_id,
-        "match_type": info.get("match_type", ""),
-        "date_start": info.get("dates", [""])[0],
-        "venue": info.get("venue", ""),
-        "city": info.get("city", ""),
-        "country": safe_get(info, ["country"], ""),
-        "home_team": teams[0] if teams else "",
-        "away_team": teams[1] if len(teams) > 1 else "",
-        "toss_winner": safe_get(info, ["toss", "winner"], ""),
-        "toss_decision": safe_get(info, ["toss", "decision"], ""),
-        "player_of_match": ",".join(info.get("player_of_match", [])),
-        "series_name": safe_get(info, ["event", "name"], ""),
-        "result": safe_get(info, ["outcome", "result"], ""),
-        "winner": safe_get(info, ["outcome", "winner"], ""),
-        "match_url": ""
-    }
-
-    ball_rows = []
-    player_innings_map = defaultdict(lambda: {"runs": 0, "balls": 0, "fours": 0, "sixes": 0})
-    bowler_stats_map = defaultdict(lambda: {"runs_conceded": 0, "balls_bowled": 0, "wickets": 0})
-
-    for innings_index, innings in enumerate(data.get("innings", []), start=1):
-        overs = innings.get("overs", [])
-
-        for over_data in overs:
-            over = over_data.get("over", 0)
-            deliveries = over_data.get("deliveries", [])
-            
-            for ball_index, d in enumerate(deliveries, start=1):
-                ball = ball_index
-                batsman = d.get("batter", "")
-                bowler = d.get("bowler", "")
-                non_striker = d.get("non_striker", "")
-
-                runs_batsman = safe_get(d, ["runs", "batter"], 0)
-                runs_extras = safe_get(d, ["runs", "extras"], 0)
-                runs_total = safe_get(d, ["runs", "total"], 0)
-
-                extras_type = ""
-                if "extras" in d:
-                    extras_type = ",".join(d["extras"].keys())
-
-                dismissal_kind = dismissed_player = ""
-                if "wicket" in d:
-                    dismissal_kind = d["wicket"].get("kind", "")
-                    dismissed_player = d["wicket"].get("player_out", "")
-                    # Count as wicket for bowler (except run-outs)
-                    if dismissal_kind not in ("run out", "retired hurt", "obstructing the field"):
-                        bowler_stats_map[bowler]["wickets"] += 1
-
-                four = 1 if runs_batsman == 4 else 0
-                six = 1 if runs_batsman == 6 else 0
-
-                # Batting stats
-                pi = player_innings_map[(innings_index, batsman)]
-                pi["runs"] += runs_batsman
-                pi["balls"] += 1
-                pi["fours"] += four
-                pi["sixes"] += six
-
-                # Bowling stats
-                bowler_stats_map[bowler]["runs_conceded"] += runs_total
-                bowler_stats_map[bowler]["balls_bowled"] += 1
-
-                # Ball-by-ball row
-                ball_rows.append({
-                    "match_id": match_id,
-                    "innings": innings_index,
-                    "over": over,
-                    "ball": ball,
-                    "striker": batsman,
-                    "non_striker": non_striker,
-                    "bowler": bowler,
-                    "runs_batsman": runs_batsman,
-                    "runs_extras": runs_extras,
-                    "runs_total": runs_total,
-                    "extra_type": extras_type,
-                    "dismissal_kind": dismissal_kind,
-                    "dismissed_player": dismissed_player,
-                    "six": six,
-                    "four": four
-                })
+    with open(file_path, "rb") as f:
+        return parse_match_data(f.read(), match_id)
+
+def parse_match_data(raw, match_id):
+    """Parse one match from the raw bytes of its Cricsheet JSON."""
+    info, deliveries = decode_match(raw)
+    squads = info.pop("players")
+    registry = info.pop("registry")
+    match_innings = [
+        {"match_id": match_id, "innings": innings, "batting_team": team}
+        for innings, team in enumerate(info.pop("innings_teams"), start=1)
+    ]
+
+    metadata = {"match_id": match_id, **info, "match_url": ""}
+
+    balls = BallColumns(match_id)
+    # Per-player accumulators as small lists, in first-seen order:
+    # batting[(innings, batter)] = [runs, balls, fours, sixes]
+    # bowling[bowler] = [runs_conceded, balls_bowled, wickets]
+    batting = {}
+    bowling = {}
+
+    for (innings_index, over, ball, batsman, bowler, non_striker, runs_batsman, runs_extras,
+         runs_total, extras_type, dismissal_kind, dismissed_player, wicket) in deliveries:
+        bw = bowling.get(bowler)
+        if bw is None:
+            bw = bowling[bowler] = [0, 0, 0]
+
+        # Count as wicket for bowler (except run-outs)
+        if wicket and dismissal_kind not in ("run out", "retired hurt", "obstructing the field"):
+            bw[2] += 1
+
+        four = 1 if runs_batsman == 4 else 0
+        six = 1 if runs_batsman == 6 else 0
+
+        # Batting stats
+        bt = batting.get((innings_index, batsman))
+        if bt is None:
+            bt = batting[(innings_index, batsman)] = [0, 0, 0, 0]
+        bt[0] += runs_batsman
+        bt[1] += 1
+        bt[2] += four
+        bt[3] += six
+
+        # Bowling stats
+        bw[0] += runs_total
+        bw[1] += 1
+
+        # Ball-by-ball row
+        balls.append(innings_index, over, ball, batsman, non_striker, bowler,
+                     runs_batsman, runs_extras, runs_total, extras_type,
+                     dismissal_kind, dismissed_player, six, four)
 
     player_innings_rows = []
-    for (inn_no, player), stats in player_innings_map.items():
-        sr = round((stats["runs"] / stats["balls"] * 100), 2) if stats["balls"] > 0 else 0.0
+    for (inn_no, player), (runs, balls_faced, fours, sixes) in batting.items():
+        sr = round((runs / balls_faced * 100), 2) if balls_faced > 0 else 0.0
         player_innings_rows.append({
             "match_id": match_id,
             "innings": inn_no,
             "player": player,
-            "runs": stats["runs"],
-            "balls": stats["balls"],
-            "fours": stats["fours"],
-            "sixes": stats["sixes"],
+            "runs": runs,
+            "balls": balls_faced,
+            "fours": fours,
+            "sixes": sixes,
             "strike_rate": sr
         })
 
-    return metadata, ball_rows, player_innings_rows, bowler_stats_map
+    bowler_stats = {
+        bowler: {"runs_conceded": runs, "balls_bowled": balls_bowled, "wickets": wickets}
+        for bowler, (runs, balls_bowled, wickets) in bowling.items()
+    }
+
+    # Squad lists first, then anyone else who batted or bowled (rare, e.g.
+    # files without info.players), each once per match
+    match_players = []
+    seen = set()
+    named = ((team, name) for team, names in squads.items() for name in names)
+    extras = (("", name) for name in [p for _, p in batting] + list(bowling) + [d[5] for d in deliveries])
+    for team, name in itertools.chain(named, extras):
+        if name and name not in seen:
+            seen.add(name)
+            match_players.append({
+                "match_id": match_id,
+                "team": team,
+                "player": name,
+                "cricsheet_id": registry.get(name, ""),
+            })
+
+    return metadata, balls, player_innings_rows, bowler_stats, match_players, match_innings
 
 def create_match_summary(metadata_list, player_innings_list, bowler_stats_all):
+    # Batting aggregates, grouped by match in a single pass:
+    # [total runs, top score, fifties, hundreds]
+    batting = {}
+    for row in player_innings_list:
+        runs = row["runs"]
+        agg = batting.get(row["match_id"])
+        if agg is None:
+            agg = batting[row["match_id"]] = [0, runs, 0, 0]
+        agg[0] += runs
+        if runs > agg[1]:
+            agg[1] = runs
+        if runs >= 100:
+            agg[3] += 1
+        elif runs >= 50:
+            agg[2] += 1
+
     summary = []
     for meta in metadata_list:
         match_id = meta["match_id"]
 
-        # Batting aggregates
-        match_runs = sum(row["runs"] for row in player_innings_list if row["match_id"] == match_id)
-        top_score = max((row["runs"] for row in player_innings_list if row["match_id"] == match_id), default=0)
-        fifties = sum(1 for row in player_innings_list if row["match_id"] == match_id and 50 <= row["runs"] < 100)
-        hundreds = sum(1 for row in player_innings_list if row["match_id"] == match_id and row["runs"] >= 100)
+        match_runs, top_score, fifties, hundreds = batting.get(match_id, (0, 0, 0, 0))
 
         # Bowling aggregates
         bowlers = bowler_stats_all.get(match_id, {})
@@ -174,68 +211,383 @@ def create_match_summary(metadata_list, player_innings_list, bowler_stats_all):
         })
     return summary
 
-def main():
-    metadata_list = []
-    all_ball_rows = []
-    all_player_innings = []
-    bowler_stats_all = {}
-
-    match_counter = 1
-    for input_dir in INPUT_DIRS:
-        if not os.path.exists(input_dir):
-            print(f"⚠️ Directory not found: {input_dir}")
-            continue
-            
-        files = glob(os.path.join(input_dir, "*.json"))
-        files.sort()
-        
-        print(f"📂 Processing {len(files)} files from {input_dir}")
-
-        for file_path in files:
-            try:
-                match_id = f"M{match_counter:06d}"
-                metadata, balls, player_innings, bowler_stats = parse_match(file_path, match_id)
-
-                metadata_list.append(metadata)
-                all_ball_rows.extend(balls)
-                all_player_innings.extend(player_innings)
-                bowler_stats_all[match_id] = bowler_stats
-                match_counter += 1
-            except Exception as e:
-                print(f"❌ Error processing {file_path}: {e}")
+# A source is either the path of an extracted JSON file or an
+# (archive path, member name) tuple for a match read straight from a zip.
+
+def source_name(source):
+    if isinstance(source, tuple):
+        return os.path.join(*source)
+    return source
+
+def list_sources(input_dir, archive):
+    """Sources for one format, ordered by file name."""
+    sources = {}
+    if os.path.exists(archive):
+        with zipfile.ZipFile(archive) as z:
+            for member in z.namelist():
+                if member.endswith(".json"):
+                    sources[os.path.basename(member)] = (archive, member)
+    if os.path.exists(input_dir):
+        for file_path in glob(os.path.join(input_dir, "*.json")):
+            sources[os.path.basename(file_path)] = file_path
+    return [sources[name] for name in sorted(sources)]
+
+# Per-process cache of open archives. The parent only opens archives with a
+# context manager (or in serial mode, where nothing is forked), so pool
+# workers never share a file offset.
+_open_archives = {}
+
+def read_source(source):
+    if not isinstance(source, tuple):
+        with open(source, "rb") as f:
+            return f.read()
+    archive, member = source
+    z = _open_archives.get(archive)
+    if z is None:
+        z = _open_archives[archive] = zipfile.ZipFile(archive)
+    return z.read(member)
+
+def match_id_for(source):
+    """Stable match ID derived from the Cricsheet file ID (the file name).
+
+    Cricsheet names files by their numeric match ID, e.g. ``1426305.json``
+    becomes ``M1426305``. Adding or removing other files never changes it.
+    """
+    stem = os.path.splitext(os.path.basename(source_name(source)))[0]
+    return f"M{int(stem):06d}" if stem.isdigit() else f"M{stem}"
+
+def parse_file(source):
+    """Pool worker: parse one source, returning (source, result, error, seconds)."""
+    start = time.perf_counter()
+    try:
+        result = parse_match_data(read_source(source), match_id_for(source))
+        return source, result, None, time.perf_counter() - start
+    except Exception as e:
+        return source, None, str(e), time.perf_counter() - start
+
+def file_crc32(file_path):
+    crc = 0
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return f"{crc:08x}"
+
+def load_manifest(manifest_file):
+    """Read the manifest into {source_file: row}; empty if it doesn't exist."""
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, newline="", encoding="utf-8") as f:
+        return {row["source_file"]: row for row in csv.DictReader(f)}
+
+def save_manifest(manifest_file, manifest):
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader()
+        writer.writerows(sorted(manifest.values(), key=lambda row: row["source_file"]))
+    os.replace(tmp_file, manifest_file)
+
+def manifest_entries(sources, old_manifest):
+    """Manifest rows for a list of sources.
+
+    The content hash is the CRC32 of the match JSON. Zip members take it
+    from the archive's central directory, so nothing has to be decompressed
+    to detect changes; files reuse the old hash if size and mtime are
+    unchanged. A match that moves between zip and directory keeps its hash.
+    """
+    archives = {}
+    for source in sources:
+        if isinstance(source, tuple):
+            archives.setdefault(source[0], {})
+
+    for archive, infos in archives.items():
+        with zipfile.ZipFile(archive) as z:
+            infos.update((info.filename, info) for info in z.infolist())
+
+    entries = []
+    for source in sources:
+        source_file = os.path.relpath(source_name(source), BASE_DIR)
+        if isinstance(source, tuple):
+            info = archives[source[0]][source[1]]
+            size, mtime_ns = info.file_size, ""
+            content_hash = f"{info.CRC:08x}"
+        else:
+            st = os.stat(source)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+            previous = old_manifest.get(source_file)
+            if previous and previous["size"] == str(size) and previous["mtime_ns"] == str(mtime_ns):
+                content_hash = previous["content_hash"]
+            else:
+                content_hash = file_crc32(source)
+        entries.append({
+            "source_file": source_file,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "content_hash": content_hash,
+            "match_id": match_id_for(source),
+        })
+    return entries
+
+def outputs_appendable(output_dir):
+    """True if every output exists with the header this parser writes.
+
+    Outputs from before RAW_DIR existed were rewritten in place by
+    extract_metadata and can't take raw rows; the first incremental run
+    after that rebuilds them once.
+    """
+    for name, fieldnames in OUTPUT_FILES.items():
+        path = os.path.join(output_dir, name)
+        if not os.path.exists(path):
+            return False
+        with open(path, newline="", encoding="utf-8") as f:
+            if next(csv.reader(f), None) != fieldnames:
+                return False
+    return True
+
+def drop_matches(output_dir, match_ids):
+    """Remove all rows belonging to match_ids from the output CSVs; returns how many were removed."""
+    dropped = 0
+    for name in OUTPUT_FILES:
+        path = os.path.join(output_dir, name)
+        with open(path, newline="", encoding="utf-8") as src, \
+                open(path + ".tmp", "w", newline="", encoding="utf-8") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            writer.writerow(next(reader))
+            for row in reader:
+                if row[0] in match_ids:
+                    dropped += 1
+                else:
+                    writer.writerow(row)
+        os.replace(path + ".tmp", path)
+    return dropped
+
+class OutputWriters:
+    """Streams rows to the output CSVs as each match is parsed.
+
+    Rows always go to ``<name>.tmp`` files first. On ``commit()`` they
+    replace the real outputs in rebuild mode and are appended to them in
+    append mode, so a run that is interrupted or parses nothing leaves the
+    previous outputs intact. main() saves the manifest right after, which
+    keeps the outputs and the manifest describing the same matches.
+    """
+
+    def __init__(self, output_dir, append=False):
+        self.output_dir = output_dir
+        self.append = append
+        self.files = {}
+        self.writers = {}
+        for name, fieldnames in OUTPUT_FILES.items():
+            f = open(os.path.join(output_dir, name + ".tmp"), "w", newline="", encoding="utf-8")
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            if not append:
+                writer.writeheader()
+            self.files[name] = f
+            self.writers[name] = writer
+
+    def write_match(self, metadata, balls, player_innings, bowler_stats, match_players, match_innings):
+        self.writers["matches_metadata.csv"].writerow(metadata)
+        # Columnar balls go straight to the underlying csv.writer as tuples
+        self.writers["ball_by_ball.csv"].writer.writerows(balls.rows())
+        self.writers["player_innings.csv"].writerows(player_innings)
+        summary = create_match_summary([metadata], player_innings, {metadata["match_id"]: bowler_stats})
+        self.writers["match_summary.csv"].writerows(summary)
+        self.writers["match_players.csv"].writerows(match_players)
+        self.writers["match_innings.csv"].writerows(match_innings)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+    def commit(self):
+        self.close()
+        for name in self.files:
+            tmp_path = os.path.join(self.output_dir, name + ".tmp")
+            path = os.path.join(self.output_dir, name)
+            if not self.append:
+                os.replace(tmp_path, path)
                 continue
-
-    if not metadata_list:
-        print("❌ No matches were processed successfully!")
+            with open(tmp_path, "rb") as src, open(path, "ab") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(tmp_path)
+
+    def discard(self):
+        self.close()
+        for name in self.files:
+            os.remove(os.path.join(self.output_dir, name + ".tmp"))
+
+def iter_parsed(files, pool, window=256):
+    """Yield parse_file results in input order.
+
+    Pool.imap has no back-pressure, so files are fed in bounded windows to
+    keep finished-but-unwritten matches from piling up in the parent.
+    """
+    if pool is None:
+        yield from map(parse_file, files)
         return
+    for start in range(0, len(files), window):
+        yield from pool.imap(parse_file, files[start:start + window], chunksize=8)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parse Cricsheet JSON into CSV outputs")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of parser processes (default: 1, serial)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only parse files that are new or changed since the last run and append their rows")
+    parser.add_argument("--parquet", action="store_true",
+                        help="also write typed Parquet copies partitioned by match_type and year")
+    parser.add_argument("--files-from",
+                        help="with --incremental, only look at the match files listed (one path per line), "
+                             "e.g. data/cricsheet/new_matches.txt from download_cricsheet.py --update")
+    return parser.parse_args()
+
+def read_file_list(list_file):
+    with open(list_file, encoding="utf-8") as f:
+        return {os.path.abspath(line.strip()) for line in f if line.strip()}
+
+def scan_sources(old_manifest, incremental, report, only=None):
+    """Work out which sources to parse.
+
+    only (a set of absolute file paths) restricts an incremental scan to
+    those files; every other match keeps its manifest entry and rows.
+
+    Returns (pending, manifest, changed_ids, removed_ids): pending is a list
+    of (source, manifest entry) in processing order, manifest the
+    carried-over entries of unchanged matches, changed_ids the matches whose
+    existing rows must be replaced and removed_ids the matches whose source
+    file is gone. Removals are only detected by a full scan, not with only.
+    """
+    manifest = dict(old_manifest) if incremental else {}
+    previous_by_id = {row["match_id"]: row for row in old_manifest.values()} if incremental else {}
+    seen_ids = {}
+    pending = []
+    changed_ids = set()
+
+    for input_dir, archive in INPUTS:
+        if not os.path.exists(input_dir) and not os.path.exists(archive):
+            print(f"⚠️ Neither directory nor archive found: {input_dir}, {archive}")
+            continue
 
-    # Write matches_metadata.csv
-    with open(os.path.join(OUTPUT_DIR, "matches_metadata.csv"), "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=metadata_list[0].keys())
-        writer.writeheader()
-        writer.writerows(metadata_list)
+        sources = list_sources(input_dir, archive)
+        if only is not None:
+            sources = [s for s in sources if not isinstance(s, tuple) and os.path.abspath(s) in only]
+        report.count("files", len(sources))
+
+        todo = []
+        for source, entry in zip(sources, manifest_entries(sources, old_manifest)):
+            match_id = entry["match_id"]
+            owner = seen_ids.get(match_id)
+            if owner is not None:
+                print(f"❌ Error processing {source_name(source)}: match ID {match_id} already used by {owner}")
+                report.count("errors")
+                continue
+            seen_ids[match_id] = entry["source_file"]
+
+            previous = previous_by_id.get(match_id)
+            if previous:
+                # Same match, possibly moved between the zip and the directory
+                del manifest[previous["source_file"]]
+                if previous["content_hash"] == entry["content_hash"]:
+                    manifest[entry["source_file"]] = entry
+                    continue
+                changed_ids.add(match_id)
+            todo.append((source, entry))
+
+        if incremental:
+            print(f"📂 Processing {len(todo)} new or changed of {len(sources)} matches from {input_dir} / {os.path.basename(archive)}")
+        else:
+            print(f"📂 Processing {len(sources)} matches from {input_dir} / {os.path.basename(archive)}")
+        pending.extend(todo)
 
-    # Write ball_by_ball.csv
-    with open(os.path.join(OUTPUT_DIR, "ball_by_ball.csv"), "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=all_ball_rows[0].keys())
-        writer.writeheader()
-        writer.writerows(all_ball_rows)
+    removed_ids = set()
+    if incremental and only is None:
+        for source_file, row in old_manifest.items():
+            if row["match_id"] not in seen_ids:
+                del manifest[source_file]
+                removed_ids.add(row["match_id"])
 
-    # Write player_innings.csv
-    with open(os.path.join(OUTPUT_DIR, "player_innings.csv"), "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=all_player_innings[0].keys())
-        writer.writeheader()
-        writer.writerows(all_player_innings)
+    return pending, manifest, changed_ids, removed_ids
 
-    # Write match_summary.csv
-    match_summary = create_match_summary(metadata_list, all_player_innings, bowler_stats_all)
-    with open(os.path.join(OUTPUT_DIR, "match_summary.csv"), "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=match_summary[0].keys())
-        writer.writeheader()
-        writer.writerows(match_summary)
+def main():
+    args = parse_args()
+    report = RunReport("parse_cricsheet", OUTPUT_DIR)
+
+    old_manifest = load_manifest(MANIFEST_FILE)
+    incremental = args.incremental
+    if incremental and not (old_manifest and outputs_appendable(RAW_DIR)):
+        print("⚠️ No appendable outputs from a previous run, doing a full rebuild")
+        incremental = False
+
+    only = None
+    if args.files_from:
+        if incremental:
+            only = read_file_list(args.files_from)
+            print(f"📋 Only scanning {len(only)} files listed in {args.files_from}")
+        else:
+            print(f"⚠️ --files-from needs an incremental run, ignoring {args.files_from}")
+
+    with report.stage("scan"):
+        pending, manifest, changed_ids, removed_ids = scan_sources(old_manifest, incremental, report, only)
+
+        if changed_ids:
+            print(f"🔄 Replacing rows for {len(changed_ids)} changed matches")
+            report.count("matches_replaced", len(changed_ids))
+        if removed_ids:
+            print(f"🗑️ Dropping rows for {len(removed_ids)} matches whose source file is gone")
+            report.count("matches_removed", len(removed_ids))
+        # A run interrupted while appending can leave rows for matches its
+        # manifest never recorded; those matches are pending again now, so
+        # their leftover rows go too
+        stale_ids = changed_ids | removed_ids
+        if incremental:
+            stale_ids |= {entry["match_id"] for _, entry in pending}
+        if stale_ids:
+            dropped = drop_matches(RAW_DIR, stale_ids)
+            report.count("rows_dropped", dropped)
+
+    with report.stage("parse_and_write"):
+        outputs = OutputWriters(RAW_DIR, append=incremental)
+        pool = Pool(args.workers) if args.workers > 1 else None
+
+        entries = dict(pending)
+        match_count = 0
+        # Results come back in input order, so output row order matches a serial run
+        for source, result, error, seconds in iter_parsed([source for source, _ in pending], pool):
+            report.record_file(source_name(source), seconds)
+            if error is not None:
+                print(f"❌ Error processing {source_name(source)}: {error}")
+                report.count("errors")
+                continue
 
-    print(f"✅ Parsing complete: {match_counter-1} matches processed")
-    print(f"📄 Files saved in {OUTPUT_DIR}")
+            outputs.write_match(*result)
+            entry = entries[source]
+            manifest[entry["source_file"]] = entry
+            match_count += 1
+            report.count("matches")
+            report.count("balls", len(result[1]))
+            report.count("rows_written", 2 + len(result[1]) + len(result[2]) + len(result[4]) + len(result[5]))
+
+        if pool:
+            pool.close()
+            pool.join()
+
+        if match_count == 0 and not incremental:
+            outputs.discard()
+            print("❌ No matches were processed successfully!")
+            report.write()
+            return
+
+        outputs.commit()
+        save_manifest(MANIFEST_FILE, manifest)
+
+    if args.parquet:
+        with report.stage("parquet_export"):
+            for name in OUTPUT_FILES:
+                export_parquet(RAW_DIR, os.path.splitext(name)[0])
+
+    print(f"✅ Parsing complete: {match_count} matches processed")
+    print(f"📄 Files saved in {RAW_DIR}")
+    report.write()
 
 if __name__ == "__main__":
     main()
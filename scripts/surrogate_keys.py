@@ -0,0 +1,80 @@
+import os
+import csv
+
+
+class KeyDictionary:
+    """Persistent key -> dense integer ID table, stored as a CSV file.
+
+    IDs run 1..n. A later run loads the file, keeps every existing ID and
+    appends unseen keys after the current maximum, so IDs already loaded
+    into DuckDB never get renumbered. Loading fails loudly if the file maps
+    one key to two IDs or one ID to two keys.
+
+        players = KeyDictionary(PLAYERS_FILE, "player_id", "cricsheet_id", PLAYER_COLUMNS)
+        players.assign(cricsheet_ids, lambda key: {"player_name": names[key]})
+        player_map = players.ids  # {cricsheet_id: player_id}
+        players.save()
+
+    Keys are any strings; extract_metadata.save_players keys players by
+    their Cricsheet person ID and falls back to "name:<player>".
+    """
+
+    def __init__(self, path, id_column, key_column, columns=None):
+        self.path = path
+        self.id_column = id_column
+        self.key_column = key_column
+        self.columns = columns or [id_column, key_column]
+        self.ids = {}
+        self.rows = []
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        if rows and self.key_column not in rows[0]:
+            print(f"⚠️ {self.path} has no {self.key_column} column, starting a new dictionary")
+            return
+        if any(not row.get(self.id_column, "").isdigit() for row in rows):
+            # e.g. the truncated-MD5 IDs written before integer keys
+            print(f"⚠️ {self.path} has non-integer IDs, starting a new dictionary")
+            return
+
+        keys_by_id = {}
+        for row in rows:
+            key, key_id = row[self.key_column], int(row[self.id_column])
+            if key in self.ids:
+                raise ValueError(f"Key collision in {self.path}: {key!r} has IDs {self.ids[key]} and {key_id}")
+            if key_id in keys_by_id:
+                raise ValueError(f"ID collision in {self.path}: {key_id} is used by {keys_by_id[key_id]!r} and {key!r}")
+            self.ids[key] = key_id
+            keys_by_id[key_id] = key
+        self.rows = rows
+
+    def assign(self, keys, new_row=None):
+        """Give every unseen key the next free ID; returns how many were added.
+
+        new_row(key) can supply the other columns of a new row.
+        """
+        next_id = max(self.ids.values(), default=0) + 1
+        added = sorted(set(keys) - self.ids.keys())
+        for key in added:
+            row = dict(new_row(key)) if new_row else {}
+            row[self.id_column] = next_id
+            row[self.key_column] = key
+            self.rows.append(row)
+            self.ids[key] = next_id
+            next_id += 1
+        return len(added)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(sorted(self.rows, key=lambda row: int(row[self.id_column])))
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.ids)
@@ -0,0 +1,160 @@
+import os
+import sys
+import csv
+import tempfile
+from collections import Counter
+
+import pytest
+
+# parse_cricsheet creates its output directories on import; keep them out of the repo
+os.environ.setdefault("CRICKET_BASE_DIR", tempfile.mkdtemp())
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import parse_cricsheet
+from generate_synthetic_cricsheet import generate_match
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """An empty data/ + output/ tree that parse_cricsheet.main() reads and writes."""
+    data_dir = tmp_path / "data" / "cricsheet"
+    output_dir = tmp_path / "output"
+    raw_dir = output_dir / "raw"
+    for fmt in ("odi", "test", "t20"):
+        (data_dir / fmt).mkdir(parents=True)
+    raw_dir.mkdir(parents=True)
+    monkeypatch.setattr(parse_cricsheet, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(parse_cricsheet, "INPUTS", [
+        (str(data_dir / fmt), str(data_dir / f"{fmt}s_json.zip")) for fmt in ("odi", "test", "t20")
+    ])
+    monkeypatch.setattr(parse_cricsheet, "OUTPUT_DIR", str(output_dir))
+    monkeypatch.setattr(parse_cricsheet, "RAW_DIR", str(raw_dir))
+    monkeypatch.setattr(parse_cricsheet, "MANIFEST_FILE", str(output_dir / "manifest.csv"))
+    return tmp_path
+
+
+def write_match(workspace, fmt, cricsheet_id, index):
+    path = workspace / "data" / "cricsheet" / fmt / f"{cricsheet_id}.json"
+    path.write_bytes(generate_match((7, index, fmt)))
+    return path
+
+
+def run_parse(monkeypatch, *args):
+    """Run parse_cricsheet.main(); returns the match IDs it parsed."""
+    parsed = []
+    parse_file = parse_cricsheet.parse_file
+
+    def recording_parse_file(source):
+        parsed.append(parse_cricsheet.match_id_for(source))
+        return parse_file(source)
+
+    monkeypatch.setattr(parse_cricsheet, "parse_file", recording_parse_file)
+    monkeypatch.setattr(sys, "argv", ["parse_cricsheet.py", *args])
+    parse_cricsheet.main()
+    return sorted(parsed)
+
+
+def read_raw(workspace, name):
+    with open(workspace / "output" / "raw" / name, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def assert_consistent(workspace):
+    """Every raw output holds exactly the manifest's matches, each once."""
+    manifest_ids = {row["match_id"] for row in parse_cricsheet.load_manifest(parse_cricsheet.MANIFEST_FILE).values()}
+    metadata_ids = Counter(row["match_id"] for row in read_raw(workspace, "matches_metadata.csv"))
+    assert max(metadata_ids.values(), default=1) == 1
+    assert set(metadata_ids) == manifest_ids
+    balls = Counter((row["match_id"], row["innings"], row["over"], row["ball"])
+                    for row in read_raw(workspace, "ball_by_ball.csv"))
+    assert max(balls.values(), default=1) == 1
+    for name in parse_cricsheet.OUTPUT_FILES:
+        assert {row["match_id"] for row in read_raw(workspace, name)} <= manifest_ids
+    return manifest_ids
+
+
+def test_incremental_parses_only_new_and_changed_files(workspace, monkeypatch):
+    for index, cricsheet_id in enumerate([1001, 1002, 1003, 1004]):
+        write_match(workspace, "odi", cricsheet_id, index)
+    # No manifest yet: falls back to a full rebuild
+    assert run_parse(monkeypatch, "--incremental") == ["M001001", "M001002", "M001003", "M001004"]
+
+    changed = write_match(workspace, "odi", 1002, 10)
+    os.utime(changed, ns=(0, 0))
+    write_match(workspace, "t20", 1005, 11)
+    os.remove(workspace / "data" / "cricsheet" / "odi" / "1004.json")
+    assert run_parse(monkeypatch, "--incremental") == ["M001002", "M001005"]
+
+    assert assert_consistent(workspace) == {"M001001", "M001002", "M001003", "M001005"}
+    venue = parse_cricsheet.decode_match(changed.read_bytes())[0]["venue"]
+    metadata = {row["match_id"]: row for row in read_raw(workspace, "matches_metadata.csv")}
+    assert metadata["M001002"]["venue"] == venue
+
+    # Nothing changed since: nothing to parse, outputs untouched
+    assert run_parse(monkeypatch, "--incremental") == []
+    assert assert_consistent(workspace) == {"M001001", "M001002", "M001003", "M001005"}
+
+
+def test_duplicate_file_ids_keep_the_first_match(workspace, monkeypatch):
+    write_match(workspace, "odi", 1001, 0)
+    write_match(workspace, "t20", 1001, 1)
+    assert run_parse(monkeypatch) == ["M001001"]
+    assert assert_consistent(workspace) == {"M001001"}
+    assert read_raw(workspace, "matches_metadata.csv")[0]["match_type"] == "ODI"
+
+
+def test_unreadable_outputs_fall_back_to_full_rebuild(workspace, monkeypatch):
+    for index, cricsheet_id in enumerate([1001, 1002]):
+        write_match(workspace, "odi", cricsheet_id, index)
+    run_parse(monkeypatch)
+    os.remove(workspace / "output" / "raw" / "ball_by_ball.csv")
+    assert run_parse(monkeypatch, "--incremental") == ["M001001", "M001002"]
+    assert assert_consistent(workspace) == {"M001001", "M001002"}
+
+
+def test_interrupted_parse_is_not_appended(workspace, monkeypatch):
+    for index, cricsheet_id in enumerate([1001, 1002]):
+        write_match(workspace, "odi", cricsheet_id, index)
+    run_parse(monkeypatch)
+    before = read_raw(workspace, "ball_by_ball.csv")
+    for index, cricsheet_id in enumerate([1003, 1004, 1005], start=2):
+        write_match(workspace, "odi", cricsheet_id, index)
+
+    write_match_rows = parse_cricsheet.OutputWriters.write_match
+    calls = []
+
+    def interrupted_write_match(self, *result):
+        calls.append(result[0]["match_id"])
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return write_match_rows(self, *result)
+
+    with monkeypatch.context() as m:
+        m.setattr(parse_cricsheet.OutputWriters, "write_match", interrupted_write_match)
+        with pytest.raises(KeyboardInterrupt):
+            run_parse(m, "--incremental")
+    assert read_raw(workspace, "ball_by_ball.csv") == before
+    assert assert_consistent(workspace) == {"M001001", "M001002"}
+
+    assert run_parse(monkeypatch, "--incremental") == ["M001003", "M001004", "M001005"]
+    assert assert_consistent(workspace) == {"M001001", "M001002", "M001003", "M001004", "M001005"}
+
+
+def test_rows_appended_without_manifest_are_dropped(workspace, monkeypatch):
+    for index, cricsheet_id in enumerate([1001, 1002]):
+        write_match(workspace, "odi", cricsheet_id, index)
+    run_parse(monkeypatch)
+    write_match(workspace, "odi", 1003, 2)
+
+    def interrupted_save_manifest(*args):
+        raise KeyboardInterrupt
+
+    # Interrupted after the rows were appended but before the manifest was saved
+    with monkeypatch.context() as m:
+        m.setattr(parse_cricsheet, "save_manifest", interrupted_save_manifest)
+        with pytest.raises(KeyboardInterrupt):
+            run_parse(m, "--incremental")
+    assert "M001003" in {row["match_id"] for row in read_raw(workspace, "matches_metadata.csv")}
+
+    assert run_parse(monkeypatch, "--incremental") == ["M001003"]
+    assert assert_consistent(workspace) == {"M001001", "M001002", "M001003"}
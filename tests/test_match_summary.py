@@ -0,0 +1,97 @@
+import os
+import sys
+import random
+import tempfile
+
+# parse_cricsheet creates its output directories on import; keep them out of the repo
+os.environ.setdefault("CRICKET_BASE_DIR", tempfile.mkdtemp())
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from parse_cricsheet import create_match_summary, parse_match_data
+from generate_synthetic_cricsheet import FORMATS, generate_match
+
+
+def four_scan_match_summary(metadata_list, player_innings_list, bowler_stats_all):
+    """create_match_summary before the single-pass grouping, kept as the oracle."""
+    summary = []
+    for meta in metadata_list:
+        match_id = meta["match_id"]
+
+        # Batting aggregates
+        match_runs = sum(row["runs"] for row in player_innings_list if row["match_id"] == match_id)
+        top_score = max((row["runs"] for row in player_innings_list if row["match_id"] == match_id), default=0)
+        fifties = sum(1 for row in player_innings_list if row["match_id"] == match_id and 50 <= row["runs"] < 100)
+        hundreds = sum(1 for row in player_innings_list if row["match_id"] == match_id and row["runs"] >= 100)
+
+        # Bowling aggregates
+        bowlers = bowler_stats_all.get(match_id, {})
+        total_wickets = sum(stats["wickets"] for stats in bowlers.values())
+        best_bowler = ""
+        best_figures = ""
+        best_economy = 0
+
+        if bowlers:
+            # Sort by wickets desc, then economy asc
+            best = sorted(
+                bowlers.items(),
+                key=lambda x: (-x[1]["wickets"], x[1]["runs_conceded"] / (x[1]["balls_bowled"]/6 if x[1]["balls_bowled"]>0 else 1))
+            )[0]
+            best_bowler = best[0]
+            best_figures = f"{best[1]['wickets']}-{best[1]['runs_conceded']}"
+            best_economy = round(best[1]['runs_conceded'] / (best[1]['balls_bowled'] / 6), 2) if best[1]['balls_bowled'] > 0 else 0
+
+        summary.append({
+            "match_id": match_id,
+            "match_type": meta["match_type"],
+            "date_start": meta["date_start"],
+            "venue": meta["venue"],
+            "home_team": meta["home_team"],
+            "away_team": meta["away_team"],
+            "winner": meta["winner"],
+            "total_runs": match_runs,
+            "highest_individual_score": top_score,
+            "fifties": fifties,
+            "hundreds": hundreds,
+            "total_wickets": total_wickets,
+            "best_bowler": best_bowler,
+            "best_bowling_figures": best_figures,
+            "best_bowler_economy": best_economy
+        })
+    return summary
+
+
+def parsed_corpus(matches=60, seed=7):
+    """(metadata, player_innings, bowler_stats) for a synthetic corpus, as the parser builds them."""
+    metadata_list, player_innings, bowler_stats_all = [], [], {}
+    formats = list(FORMATS)
+    for index in range(matches):
+        match_id = f"M{index:06d}"
+        raw = generate_match((seed, index, formats[index % len(formats)]))
+        metadata, _, innings_rows, bowler_stats, _, _ = parse_match_data(raw, match_id)
+        metadata_list.append(metadata)
+        player_innings.extend(innings_rows)
+        bowler_stats_all[match_id] = bowler_stats
+    return metadata_list, player_innings, bowler_stats_all
+
+
+def test_matches_four_scan_summary_on_shuffled_innings():
+    metadata_list, player_innings, bowler_stats_all = parsed_corpus()
+    # A match with no innings rows and no bowling at all (e.g. abandoned)
+    metadata_list.append({**metadata_list[0], "match_id": "M999999", "winner": ""})
+    random.Random(1).shuffle(player_innings)
+
+    expected = four_scan_match_summary(metadata_list, player_innings, bowler_stats_all)
+    assert create_match_summary(metadata_list, player_innings, bowler_stats_all) == expected
+    assert expected[-1]["total_runs"] == 0 and expected[-1]["highest_individual_score"] == 0
+    # The corpus exercises every batting bucket
+    assert any(row["fifties"] for row in expected) and any(row["hundreds"] for row in expected)
+
+
+def test_per_match_calls_match_whole_corpus_call():
+    # OutputWriters summarizes one match at a time
+    metadata_list, player_innings, bowler_stats_all = parsed_corpus(matches=12)
+    per_match = []
+    for meta in metadata_list:
+        rows = [row for row in player_innings if row["match_id"] == meta["match_id"]]
+        per_match += create_match_summary([meta], rows, bowler_stats_all)
+    assert per_match == four_scan_match_summary(metadata_list, player_innings, bowler_stats_all)